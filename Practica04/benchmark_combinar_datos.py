@@ -0,0 +1,83 @@
+"""
+Benchmark de la etapa de agregación (combinar_datos)
+Mide cómo escala agregar_datos al crecer el número de posts y lo compara
+con el cálculo original de usuario_mas_activo, que recorría todos los
+posts por cada usuario (O(usuarios × posts)).
+
+Uso:
+    python benchmark_combinar_datos.py                 # de 100 a 1M posts
+    python benchmark_combinar_datos.py --max 10000000  # hasta 10M posts (requiere varios GB de RAM)
+"""
+
+import argparse
+import random
+import time
+from typing import Dict, List
+
+from prefect_json_example import agregar_datos
+
+# Tamaños hasta los que también se mide el algoritmo cuadrático original
+MAX_POSTS_CUADRATICO = 10_000
+
+def generar_datos(num_posts: int, semilla: int = 42):
+    """Genera posts ya procesados, usuarios y conteos de comentarios sintéticos"""
+    aleatorio = random.Random(semilla)
+    num_usuarios = max(10, num_posts // 100)
+    
+    usuarios = [{
+        "id": i,
+        "nombre": f"Usuario {i}",
+        "email": f"usuario{i}@ejemplo.com",
+        "ciudad": "Ciudad"
+    } for i in range(1, num_usuarios + 1)]
+    
+    posts = [{
+        "id": i,
+        "titulo": "Titulo",
+        "contenido": "Contenido",
+        "usuario_id": aleatorio.randint(1, num_usuarios),
+        "palabras_titulo": aleatorio.randint(1, 12),
+        "palabras_contenido": aleatorio.randint(10, 200)
+    } for i in range(1, num_posts + 1)]
+    
+    comentarios_por_post = {i: aleatorio.randint(0, 10) for i in range(1, num_posts + 1)}
+    return posts, usuarios, comentarios_por_post
+
+def usuario_mas_activo_cuadratico(posts: List[Dict], usuarios: List[Dict]) -> Dict:
+    """Cálculo original: cuenta los posts de cada usuario recorriendo la lista completa"""
+    usuarios_map = {u["id"]: u for u in usuarios}
+    return max(usuarios_map.values(), key=lambda x: len([p for p in posts if p["usuario_id"] == x["id"]]))
+
+def medir(funcion, *args) -> float:
+    inicio = time.perf_counter()
+    funcion(*args)
+    return time.perf_counter() - inicio
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de agregar_datos")
+    parser.add_argument("--max", type=int, default=1_000_000, help="Número máximo de posts")
+    args = parser.parse_args()
+    
+    tamanos = []
+    tamano = 100
+    while tamano <= args.max:
+        tamanos.append(tamano)
+        tamano *= 10
+    
+    print(f"{'Posts':>12} {'Usuarios':>10} {'agregar_datos (s)':>18} {'posts/s':>14} {'original (s)':>14}")
+    print("-" * 72)
+    
+    for num_posts in tamanos:
+        posts, usuarios, comentarios_por_post = generar_datos(num_posts)
+        
+        tiempo = medir(agregar_datos, posts, usuarios, comentarios_por_post)
+        
+        if num_posts <= MAX_POSTS_CUADRATICO:
+            tiempo_original = f"{medir(usuario_mas_activo_cuadratico, posts, usuarios):14.4f}"
+        else:
+            tiempo_original = f"{'(omitido)':>14}"
+        
+        print(f"{num_posts:>12,} {len(usuarios):>10,} {tiempo:18.4f} {num_posts / tiempo:14,.0f} {tiempo_original}")
+
+if __name__ == "__main__":
+    main()
@@ -1,34 +1,172 @@
 from faker import Faker
+import argparse
+import csv
+import io
 import json
+import os
+import random
+import sys
+import textwrap
+from collections import deque
+from itertools import islice
+from multiprocessing import Pool
+
+# Parquet output is optional
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
 
 # Initialize Faker
 fake = Faker()
 
+FIELDS = ["id", "name", "address", "email", "phone_number", "job_title",
+          "company", "date_of_birth", "profile_summary"]
+FORMATS = {"json": ".json", "jsonl": ".jsonl", "csv": ".csv", "parquet": ".parquet"}
+CHUNK_SIZE = 10_000  # Records generated (and written) per task
+CHUNKS_PER_WORKER = 2  # Chunks queued or finished but not yet written, per worker
+
 # Function to generate a single fake user record
-def generate_fake_user():
+def generate_fake_user(faker_instance=None):
+    f = faker_instance or fake
     return {
-        "id": fake.uuid4(),  # Unique ID
-        "name": fake.name(),
-        "address": fake.address(),
-        "email": fake.email(),
-        "phone_number": fake.phone_number(),
-        "job_title": fake.job(),
-        "company": fake.company(),
-        "date_of_birth": fake.date_of_birth(minimum_age=18, maximum_age=65).isoformat(),
-        "profile_summary": fake.paragraph(nb_sentences=3)
+        "id": f.uuid4(),  # Unique ID
+        "name": f.name(),
+        "address": f.address(),
+        "email": f.email(),
+        "phone_number": f.phone_number(),
+        "job_title": f.job(),
+        "company": f.company(),
+        "date_of_birth": f.date_of_birth(minimum_age=18, maximum_age=65).isoformat(),
+        "profile_summary": f.paragraph(nb_sentences=3)
     }
 
-# Generate a list of multiple fake user records
-num_records = 10
-fake_data = [generate_fake_user() for _ in range(num_records)]
+# --- Chunk serializers (run inside the workers, so encoding also scales with cores) ---
 
-# Define the output filename
-output_filename = "fake_users_data.json"
+def serialize_json(records, first_chunk):
+    # Same layout as json.dump(records, indent=4): every item indented one level inside the list
+    items = ",\n".join(textwrap.indent(json.dumps(r, indent=4, ensure_ascii=False), "    ") for r in records)
+    return items if first_chunk else ",\n" + items
 
-# Save the data to a JSON file
-try:
-    with open(output_filename, 'w', encoding='utf-8') as json_file:
-        json.dump(fake_data, json_file, indent=4, ensure_ascii=False)
-    print(f"Successfully generated '{num_records}' fake user records and saved to '{output_filename}'")
-except IOError as e:
-    print(f"Error writing to file: {e}")
\ No newline at end of file
+def serialize_jsonl(records, first_chunk):
+    return "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records)
+
+def serialize_csv(records, first_chunk):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=FIELDS)
+    if first_chunk:
+        writer.writeheader()
+    writer.writerows(records)
+    return buffer.getvalue()
+
+def serialize_parquet(records, first_chunk):
+    return pa.Table.from_pydict({field: [r[field] for r in records] for field in FIELDS})
+
+SERIALIZERS = {
+    "json": serialize_json,
+    "jsonl": serialize_jsonl,
+    "csv": serialize_csv,
+    "parquet": serialize_parquet,
+}
+
+# --- Workers ---
+
+_worker_fake = None
+
+def init_worker():
+    # One Faker instance per worker process
+    global _worker_fake
+    _worker_fake = Faker()
+
+def generate_chunk(task):
+    """Generates and serializes one chunk; the chunk seed depends only on its index,
+    so the output for a given --seed is the same with any number of workers."""
+    index, count, seed, output_format = task
+    f = _worker_fake or fake
+    # Always reseed: forked workers inherit a copy of Faker's shared Random and would repeat each other
+    f.seed_instance(f"{seed}-{index}")  # Distinct, reproducible stream per chunk
+    records = [generate_fake_user(f) for _ in range(count)]
+    return SERIALIZERS[output_format](records, index == 0)
+
+def chunk_tasks(num_records, seed, output_format, chunk_size=CHUNK_SIZE):
+    for index, start in enumerate(range(0, num_records, chunk_size)):
+        yield index, min(chunk_size, num_records - start), seed, output_format
+
+def generate_chunks(num_records, seed, output_format, workers, chunk_size=CHUNK_SIZE):
+    """Yields serialized chunks in order, keeping at most CHUNKS_PER_WORKER chunks per worker in flight"""
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(64)  # Fresh base per run, drawn once in the parent
+    tasks = chunk_tasks(num_records, seed, output_format, chunk_size)
+    if workers <= 1:
+        init_worker()
+        yield from map(generate_chunk, tasks)
+        return
+    with Pool(workers, initializer=init_worker) as pool:
+        # Pool.imap would queue every task at once and buffer results if writing falls behind
+        in_flight = deque(pool.apply_async(generate_chunk, (t,)) for t in islice(tasks, workers * CHUNKS_PER_WORKER))
+        while in_flight:
+            chunk = in_flight.popleft().get()
+            for t in islice(tasks, 1):
+                in_flight.append(pool.apply_async(generate_chunk, (t,)))
+            yield chunk
+
+def write_records(output_filename, num_records, seed=None, output_format="json", workers=1,
+                  chunk_size=CHUNK_SIZE):
+    """Streams the generated records to output_filename"""
+    chunks = generate_chunks(num_records, seed, output_format, workers, chunk_size)
+
+    if output_format == "parquet":
+        writer = None
+        try:
+            for table in chunks:
+                if writer is None:
+                    writer = pq.ParquetWriter(output_filename, table.schema, compression="zstd")
+                writer.write_table(table)  # One row group per chunk
+        finally:
+            if writer is not None:
+                writer.close()
+        return
+
+    newline = "" if output_format == "csv" else None
+    with open(output_filename, 'w', encoding='utf-8', newline=newline) as output_file:
+        if output_format == "json":
+            output_file.write("[\n")
+        for chunk in chunks:
+            output_file.write(chunk)
+        if output_format == "json":
+            output_file.write("\n]" if num_records else "]")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate fake user records for load-test fixtures")
+    parser.add_argument("-n", "--num-records", type=int, default=10, help="Number of records (default: 10)")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for reproducible output")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1,
+                        help="Worker processes (default: number of CPUs)")
+    parser.add_argument("-f", "--format", choices=sorted(FORMATS), default="json",
+                        help="Output format (default: json)")
+    parser.add_argument("-o", "--output", default=None,
+                        help="Output file (default: fake_users_data.<ext>)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Records per chunk")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    if args.format == "parquet" and not PYARROW_AVAILABLE:
+        print("Parquet output requires pyarrow: pip install pyarrow")
+        sys.exit(1)
+
+    # Define the output filename
+    output_filename = args.output or "fake_users_data" + FORMATS[args.format]
+
+    # Save the data to the output file
+    try:
+        write_records(output_filename, args.num_records, args.seed, args.format, args.workers, args.chunk_size)
+        print(f"Successfully generated '{args.num_records}' fake user records and saved to '{output_filename}'")
+    except IOError as e:
+        print(f"Error writing to file: {e}")
+
+if __name__ == "__main__":
+    main()
@@ -11,15 +11,297 @@ Este programa demuestra cómo usar Prefect para:
 from prefect import task, flow
 from prefect.logging import get_run_logger
 import requests
+from requests.adapters import HTTPAdapter
+import gzip
+import hashlib
 import json
 import os
-from typing import List, Dict, Any
-from datetime import datetime
+import tempfile
+import threading
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from html import escape
+from string import Formatter
+from typing import Callable, List, Dict, Any, Iterable, Iterator, Optional, Tuple
+from datetime import datetime, timedelta
 import time
 
+# Formatos columnares opcionales (Parquet / Arrow IPC)
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+from prefect.tasks import task_input_hash
+
+try:
+    from prefect.task_runners import ThreadPoolTaskRunner
+except ImportError:  # Prefect 2.x
+    from prefect.task_runners import ConcurrentTaskRunner as ThreadPoolTaskRunner
+
 # Configuración 
-BASE_URL = "https://jsonplaceholder.typicode.com"
+BASE_URL = os.environ.get("JSONPLACEHOLDER_URL", "https://jsonplaceholder.typicode.com")
 DATA_DIR = "json_data"
+HTTP_TIMEOUT = 10
+HTTP_POOL_SIZE = 10
+TAMANO_PAGINA = 100        # Registros por página en los endpoints paginados
+PAGINAS_EN_VUELO = 4       # Máximo de páginas pedidas y aún no consumidas
+
+# Caché HTTP local: dentro del TTL no se hace ninguna petición; pasado el TTL se
+# revalida con ETag / Last-Modified y un 304 reutiliza el cuerpo guardado
+HTTP_CACHE_DIR = os.path.join(DATA_DIR, ".http_cache")
+HTTP_CACHE_TTL = 300       # segundos
+# Límites de la caché HTTP: se borran primero las entradas sin uso más antiguas
+HTTP_CACHE_TAMANO_MAXIMO = 256 * 1024 * 1024   # bytes
+HTTP_CACHE_EDAD_MAXIMA = 7 * 24 * 3600         # segundos sin uso
+HTTP_CACHE_PURGAR_CADA = 256                   # escrituras entre purgas
+# Vigencia de los resultados cacheados de las tareas de procesamiento de Prefect
+CACHE_TAREAS_EXPIRACION = timedelta(hours=1)
+# Campos que cambian en cada ejecución y no deben invalidar la caché de tareas
+CAMPOS_VOLATILES = {"fecha_procesamiento"}
+
+# Formatos de salida para las tablas del pipeline y su extensión
+FORMATOS_SALIDA = {
+    "json": ".json",            # JSON con indentación (formato original)
+    "json_compacto": ".json",   # JSON sin espacios
+    "jsonl": ".jsonl",          # Un registro por línea
+    "parquet": ".parquet",      # Columnar comprimido
+    "arrow": ".arrow",          # Arrow IPC: se puede mapear en memoria sin copiar si no se comprime
+}
+
+# Arrow IPC solo admite estos códecs (a diferencia de parquet)
+COMPRESIONES_ARROW = ("lz4", "zstd")
+
+# Reporte HTML: filas por página de cada tabla y tamaño del buffer de escritura
+FILAS_POR_PAGINA_REPORTE = 50
+TAMANO_BUFFER_REPORTE = 64 * 1024
+
+# Sesión HTTP compartida: reutiliza conexiones (keep-alive) entre peticiones y tareas
+_sesion_http = None
+_sesion_lock = threading.Lock()
+
+def obtener_sesion_http() -> requests.Session:
+    """Devuelve la sesión HTTP compartida, creándola la primera vez"""
+    global _sesion_http
+    with _sesion_lock:
+        if _sesion_http is None:
+            sesion = requests.Session()
+            adaptador = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE)
+            sesion.mount("http://", adaptador)
+            sesion.mount("https://", adaptador)
+            _sesion_http = sesion
+        return _sesion_http
+
+def _validador(entrada: Dict[str, Any]) -> Optional[str]:
+    """ETag o Last-Modified de la respuesta, con el X-Total-Count que envía el servidor al paginar"""
+    validador = entrada.get("etag") or entrada.get("last_modified")
+    if validador and entrada.get("total") is not None:
+        validador = f"{validador};total={entrada['total']}"
+    return validador
+
+class CacheHTTP:
+    """
+    Caché en disco de respuestas JSON con TTL y peticiones condicionales (ETag / Last-Modified)
+    
+    El directorio se limita a tamano_maximo bytes y a entradas usadas en los últimos edad_maxima
+    segundos: cada purgar_cada escrituras se eliminan las que sobran, las menos usadas primero.
+    """
+    
+    def __init__(self, directorio: str = HTTP_CACHE_DIR, ttl: float = HTTP_CACHE_TTL,
+                 tamano_maximo: int = HTTP_CACHE_TAMANO_MAXIMO, edad_maxima: float = HTTP_CACHE_EDAD_MAXIMA,
+                 purgar_cada: int = HTTP_CACHE_PURGAR_CADA):
+        self.directorio = directorio
+        self.ttl = ttl
+        self.tamano_maximo = tamano_maximo
+        self.edad_maxima = edad_maxima
+        self.purgar_cada = purgar_cada
+        self._escrituras = 0
+        self._lock = threading.Lock()
+        os.makedirs(directorio, exist_ok=True)
+    
+    def _ruta_entrada(self, url: str) -> str:
+        return os.path.join(self.directorio, hashlib.sha256(url.encode()).hexdigest() + ".json")
+    
+    def _leer(self, url: str) -> Optional[Dict[str, Any]]:
+        ruta = self._ruta_entrada(url)
+        try:
+            with open(ruta, 'r', encoding='utf-8') as file:
+                entrada = json.load(file)
+        except (OSError, ValueError):
+            return None
+        
+        # Marcar la entrada como usada recientemente para la purga
+        try:
+            os.utime(ruta)
+        except OSError:
+            pass
+        return entrada
+    
+    def _escribir(self, url: str, entrada: Dict[str, Any]):
+        # Escritura atómica: varias tareas pueden escribir a la vez desde distintos hilos
+        fd, ruta_temporal = tempfile.mkstemp(dir=self.directorio, suffix=".tmp")
+        with os.fdopen(fd, 'w', encoding='utf-8') as file:
+            json.dump(entrada, file, ensure_ascii=False)
+        os.replace(ruta_temporal, self._ruta_entrada(url))
+        
+        with self._lock:
+            self._escrituras += 1
+            purgar = self._escrituras % self.purgar_cada == 0
+        if purgar:
+            self.purgar()
+    
+    def purgar(self) -> int:
+        """Elimina las entradas sin uso reciente y, si aún sobra espacio, las menos usadas; devuelve cuántas borró"""
+        limite_edad = time.time() - self.edad_maxima
+        entradas = []
+        total = 0
+        with os.scandir(self.directorio) as it:
+            for entrada in it:
+                if entrada.is_file() and entrada.name.endswith(".json"):
+                    try:
+                        info = entrada.stat()
+                    except OSError:
+                        continue
+                    entradas.append((info.st_mtime, info.st_size, entrada.path))
+                    total += info.st_size
+        
+        eliminadas = 0
+        for mtime, tamano, ruta in sorted(entradas):
+            if total <= self.tamano_maximo and mtime >= limite_edad:
+                break
+            try:
+                os.remove(ruta)
+            except OSError:
+                continue
+            total -= tamano
+            eliminadas += 1
+        return eliminadas
+    
+    def obtener(self, sesion: requests.Session, url: str, params: Dict[str, Any] = None) -> Any:
+        """Devuelve el JSON de la URL usando la copia local cuando sigue siendo válida"""
+        return self.obtener_con_validador(sesion, url, params)[0]
+    
+    def obtener_con_validador(self, sesion: requests.Session, url: str,
+                              params: Dict[str, Any] = None) -> Tuple[Any, Optional[str]]:
+        """Como obtener, pero devuelve también el ETag (o Last-Modified) de la respuesta, si lo hay"""
+        url_completa = requests.Request("GET", url, params=params).prepare().url
+        entrada = self._leer(url_completa)
+        
+        if entrada is not None and time.time() - entrada["guardado"] < self.ttl:
+            return entrada["datos"], _validador(entrada)
+        
+        cabeceras = {}
+        if entrada is not None:
+            if entrada.get("etag"):
+                cabeceras["If-None-Match"] = entrada["etag"]
+            if entrada.get("last_modified"):
+                cabeceras["If-Modified-Since"] = entrada["last_modified"]
+        
+        response = sesion.get(url_completa, headers=cabeceras, timeout=HTTP_TIMEOUT)
+        
+        if response.status_code == 304 and entrada is not None:
+            # Sin cambios en el servidor: se renueva la vigencia sin descargar el cuerpo
+            entrada["guardado"] = time.time()
+            self._escribir(url_completa, entrada)
+            return entrada["datos"], _validador(entrada)
+        
+        response.raise_for_status()
+        entrada = {
+            "guardado": time.time(),
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "total": response.headers.get("X-Total-Count"),
+            "datos": response.json()
+        }
+        self._escribir(url_completa, entrada)
+        return entrada["datos"], _validador(entrada)
+
+_cache_http = None
+
+def obtener_cache_http() -> CacheHTTP:
+    """Devuelve la caché HTTP compartida, creándola la primera vez"""
+    global _cache_http
+    with _sesion_lock:
+        if _cache_http is None:
+            _cache_http = CacheHTTP()
+        return _cache_http
+
+def obtener_json(recurso: str, params: Dict[str, Any] = None) -> Any:
+    """GET de un recurso de la API usando la sesión compartida y la caché HTTP local"""
+    return obtener_cache_http().obtener(obtener_sesion_http(), f"{BASE_URL}/{recurso}", params)
+
+def obtener_json_con_validador(recurso: str, params: Dict[str, Any] = None) -> Tuple[Any, Optional[str]]:
+    """Como obtener_json, devolviendo también el ETag/Last-Modified de la respuesta"""
+    return obtener_cache_http().obtener_con_validador(obtener_sesion_http(), f"{BASE_URL}/{recurso}", params)
+
+def clave_cache_sin_volatiles(context, parameters: Dict[str, Any]) -> str:
+    """
+    cache_key_fn para Prefect: hash de las entradas de la tarea ignorando CAMPOS_VOLATILES,
+    de modo que datos de origen sin cambios reutilicen el resultado del procesamiento.
+    """
+    sha = hashlib.sha256(context.task.fn.__qualname__.encode())
+    for nombre in sorted(parameters):
+        sha.update(nombre.encode())
+        valor = parameters[nombre]
+        for registro in (valor if isinstance(valor, list) else [valor]):
+            if isinstance(registro, dict):
+                registro = {k: v for k, v in registro.items() if k not in CAMPOS_VOLATILES}
+            sha.update(json.dumps(registro, sort_keys=True, default=str).encode())
+    return sha.hexdigest()
+
+def iterar_paginas(recurso: str, tamano_pagina: int = TAMANO_PAGINA,
+                   max_en_vuelo: int = PAGINAS_EN_VUELO) -> Iterator[List[Dict]]:
+    """
+    Genera un recurso página a página (?_page=N&_limit=M) sin cargarlo entero en memoria.
+    
+    Mantiene como máximo max_en_vuelo páginas pedidas por adelantado; no se piden más
+    hasta que el consumidor procesa las anteriores (back-pressure). La primera página se pide
+    sola: si el recurso cabe en ella no se hace ninguna petición más.
+    """
+    with ThreadPoolExecutor(max_workers=max_en_vuelo) as executor:
+        pendientes = deque()
+        siguiente_pagina = 1
+        fin = False
+        en_vuelo = 1
+        
+        while True:
+            while not fin and len(pendientes) < en_vuelo:
+                params = {"_page": siguiente_pagina, "_limit": tamano_pagina}
+                pendientes.append(executor.submit(obtener_json, recurso, params))
+                siguiente_pagina += 1
+            
+            if not pendientes:
+                break
+            
+            pagina = pendientes.popleft().result()
+            # Una página incompleta marca el final; las ya pedidas detrás llegarán vacías
+            if len(pagina) < tamano_pagina:
+                fin = True
+            else:
+                en_vuelo = max_en_vuelo
+            if pagina:
+                yield pagina
+
+def clave_cache_paginas(recurso: str) -> Callable[[Any, Dict[str, Any]], str]:
+    """
+    cache_key_fn para Prefect en tareas que recorren un recurso paginado: revalida solo la primera
+    página contra la caché HTTP (una petición condicional, sin cuerpo si no cambió) y usa su
+    ETag/Last-Modified junto con el total de registros (X-Total-Count). Con el origen sin cambios
+    la clave se repite y Prefect reutiliza el resultado sin recorrer el recurso.
+    
+    Un cambio que no toque la primera página ni el total se recoge al vencer CACHE_TAREAS_EXPIRACION.
+    """
+    def clave(context, parameters: Dict[str, Any]) -> str:
+        tamano_pagina = parameters.get("tamano_pagina", TAMANO_PAGINA)
+        sha = hashlib.sha256(f"{context.task.fn.__qualname__}:{recurso}:{tamano_pagina}".encode())
+        pagina, validador = obtener_json_con_validador(recurso, {"_page": 1, "_limit": tamano_pagina})
+        # Sin validadores del servidor se usa el contenido de la página
+        sha.update((validador or json.dumps(pagina, sort_keys=True)).encode())
+        return sha.hexdigest()
+    return clave
 
 @task
 def crear_directorio_datos() -> str:
@@ -35,54 +317,45 @@ def crear_directorio_datos() -> str:
     return DATA_DIR
 
 @task(retries=3, retry_delay_seconds=2)
-def obtener_posts() -> List[Dict]:
-    """Obtiene todos los posts de JSONPlaceholder"""
+def obtener_usuarios() -> List[Dict]:
+    """Obtiene todos los usuarios de JSONPlaceholder"""
     logger = get_run_logger()
     
     try:
-        logger.info("Obteniendo posts de JSONPlaceholder...")
-        response = requests.get(f"{BASE_URL}/posts", timeout=10)
-        response.raise_for_status()
-        
-        posts = response.json()
-        logger.info(f"Obtenidos {len(posts)} posts exitosamente")
+        logger.info("Obteniendo usuarios de JSONPlaceholder...")
+        usuarios = obtener_json("users")
+        logger.info(f"Obtenidos {len(usuarios)} usuarios exitosamente")
         
-        return posts
+        return usuarios
     
     except requests.RequestException as e:
-        logger.error(f"Error al obtener posts: {e}")
+        logger.error(f"Error al obtener usuarios: {e}")
         raise
 
 @task(retries=3, retry_delay_seconds=2)
-def obtener_usuarios() -> List[Dict]:
-    """Obtiene todos los usuarios de JSONPlaceholder"""
+def obtener_posts() -> List[Dict]:
+    """Obtiene todos los posts de JSONPlaceholder (por páginas; el pipeline usa obtener_y_procesar_posts)"""
     logger = get_run_logger()
     
     try:
-        logger.info("Obteniendo usuarios de JSONPlaceholder...")
-        response = requests.get(f"{BASE_URL}/users", timeout=10)
-        response.raise_for_status()
-        
-        usuarios = response.json()
-        logger.info(f"Obtenidos {len(usuarios)} usuarios exitosamente")
+        logger.info("Obteniendo posts de JSONPlaceholder...")
+        posts = [post for lote in iterar_paginas("posts") for post in lote]
+        logger.info(f"Obtenidos {len(posts)} posts exitosamente")
         
-        return usuarios
+        return posts
     
     except requests.RequestException as e:
-        logger.error(f"Error al obtener usuarios: {e}")
+        logger.error(f"Error al obtener posts: {e}")
         raise
 
 @task(retries=3, retry_delay_seconds=2)
 def obtener_comentarios() -> List[Dict]:
-    """Obtiene todos los comentarios de JSONPlaceholder"""
+    """Obtiene todos los comentarios de JSONPlaceholder (por páginas; el pipeline solo los cuenta)"""
     logger = get_run_logger()
     
     try:
         logger.info("Obteniendo comentarios de JSONPlaceholder...")
-        response = requests.get(f"{BASE_URL}/comments", timeout=10)
-        response.raise_for_status()
-        
-        comentarios = response.json()
+        comentarios = [comentario for lote in iterar_paginas("comments") for comentario in lote]
         logger.info(f"Obtenidos {len(comentarios)} comentarios exitosamente")
         
         return comentarios
@@ -91,76 +364,130 @@ def obtener_comentarios() -> List[Dict]:
         logger.error(f"Error al obtener comentarios: {e}")
         raise
 
-@task
+def transformar_posts_columnas(posts: List[Dict], fecha_procesamiento: str) -> Dict[str, list]:
+    """
+    Transformación por columnas de un lote de posts: cada métrica se calcula
+    recorriendo una sola columna, y la marca de tiempo es una por lote.
+    """
+    titulos = [post["title"] for post in posts]
+    contenidos = [post["body"] for post in posts]
+    return {
+        "id": [post["id"] for post in posts],
+        "titulo": [titulo.title() for titulo in titulos],  # Capitalizar título
+        "contenido": contenidos,
+        "usuario_id": [post["userId"] for post in posts],
+        "longitud_titulo": list(map(len, titulos)),
+        "longitud_contenido": list(map(len, contenidos)),
+        "palabras_titulo": [len(titulo.split()) for titulo in titulos],
+        "palabras_contenido": [len(contenido.split()) for contenido in contenidos],
+        "fecha_procesamiento": fecha_procesamiento
+    }
+
+def procesar_lote_posts(posts: List[Dict]) -> List[Dict]:
+    """Transforma un lote de posts crudos de la API (adaptador a lista de dicts)"""
+    # Una sola marca de tiempo por lote
+    columnas = transformar_posts_columnas(posts, datetime.now().isoformat())
+    fecha = columnas.pop("fecha_procesamiento")
+    nombres = list(columnas)
+    
+    return [
+        {**dict(zip(nombres, fila)), "fecha_procesamiento": fecha}
+        for fila in zip(*columnas.values())
+    ]
+
+def procesar_lote_usuarios(usuarios: List[Dict]) -> List[Dict]:
+    """Simplifica un lote de usuarios crudos de la API"""
+    # Una sola marca de tiempo por lote
+    fecha = datetime.now().isoformat()
+    
+    return [{
+        "id": usuario["id"],
+        "nombre": usuario["name"],
+        "username": usuario["username"],
+        "email": usuario["email"],
+        "telefono": usuario["phone"],
+        "website": usuario["website"],
+        "ciudad": usuario["address"]["city"],
+        "codigo_postal": usuario["address"]["zipcode"],
+        "empresa": usuario["company"]["name"],
+        "fecha_procesamiento": fecha
+    } for usuario in usuarios]
+
+@task(retries=3, retry_delay_seconds=2, cache_key_fn=clave_cache_paginas("posts"),
+      cache_expiration=CACHE_TAREAS_EXPIRACION, persist_result=True)
+def obtener_y_procesar_posts(tamano_pagina: int = TAMANO_PAGINA) -> List[Dict]:
+    """Descarga los posts por páginas y procesa cada lote al llegar (no retiene los datos crudos)"""
+    logger = get_run_logger()
+    logger.info(f"Obteniendo posts por páginas de {tamano_pagina}...")
+    
+    posts_procesados = []
+    try:
+        for lote in iterar_paginas("posts", tamano_pagina):
+            posts_procesados.extend(procesar_lote_posts(lote))
+    except requests.RequestException as e:
+        logger.error(f"Error al obtener posts: {e}")
+        raise
+    
+    logger.info(f"Procesados {len(posts_procesados)} posts")
+    return posts_procesados
+
+@task(retries=3, retry_delay_seconds=2, cache_key_fn=clave_cache_paginas("comments"),
+      cache_expiration=CACHE_TAREAS_EXPIRACION, persist_result=True)
+def contar_comentarios_por_post(tamano_pagina: int = TAMANO_PAGINA) -> Dict[int, int]:
+    """Recorre los comentarios por páginas y solo conserva el conteo por post"""
+    logger = get_run_logger()
+    logger.info(f"Contando comentarios por páginas de {tamano_pagina}...")
+    
+    comentarios_por_post = Counter()
+    try:
+        for lote in iterar_paginas("comments", tamano_pagina):
+            comentarios_por_post.update(comentario["postId"] for comentario in lote)
+    except requests.RequestException as e:
+        logger.error(f"Error al obtener comentarios: {e}")
+        raise
+    
+    logger.info(f"Contados {sum(comentarios_por_post.values())} comentarios")
+    return dict(comentarios_por_post)
+
+@task(cache_key_fn=task_input_hash, cache_expiration=CACHE_TAREAS_EXPIRACION, persist_result=True)
 def procesar_posts(posts: List[Dict]) -> List[Dict]:
     """Procesa y enriquece la información de los posts"""
     logger = get_run_logger()
     logger.info("Procesando posts...")
     
-    posts_procesados = []
-    
-    for post in posts:
-        post_procesado = {
-            "id": post["id"],
-            "titulo": post["title"].title(),  # Capitalizar título
-            "contenido": post["body"],
-            "usuario_id": post["userId"],
-            "longitud_titulo": len(post["title"]),
-            "longitud_contenido": len(post["body"]),
-            "palabras_titulo": len(post["title"].split()),
-            "palabras_contenido": len(post["body"].split()),
-            "fecha_procesamiento": datetime.now().isoformat()
-        }
-        posts_procesados.append(post_procesado)
+    posts_procesados = procesar_lote_posts(posts)
     
     logger.info(f"Procesados {len(posts_procesados)} posts")
     return posts_procesados
 
-@task
+@task(cache_key_fn=task_input_hash, cache_expiration=CACHE_TAREAS_EXPIRACION, persist_result=True)
 def procesar_usuarios(usuarios: List[Dict]) -> List[Dict]:
     """Procesa y simplifica la información de usuarios"""
     logger = get_run_logger()
     logger.info("Procesando usuarios...")
     
-    usuarios_procesados = []
-    
-    for usuario in usuarios:
-        usuario_procesado = {
-            "id": usuario["id"],
-            "nombre": usuario["name"],
-            "username": usuario["username"],
-            "email": usuario["email"],
-            "telefono": usuario["phone"],
-            "website": usuario["website"],
-            "ciudad": usuario["address"]["city"],
-            "codigo_postal": usuario["address"]["zipcode"],
-            "empresa": usuario["company"]["name"],
-            "fecha_procesamiento": datetime.now().isoformat()
-        }
-        usuarios_procesados.append(usuario_procesado)
+    usuarios_procesados = procesar_lote_usuarios(usuarios)
     
     logger.info(f"Procesados {len(usuarios_procesados)} usuarios")
     return usuarios_procesados
 
-@task
-def combinar_datos(posts: List[Dict], usuarios: List[Dict], comentarios: List[Dict]) -> Dict[str, Any]:
-    """Combina y analiza todos los datos obtenidos"""
-    logger = get_run_logger()
-    logger.info("Combinando y analizando datos...")
+def agregar_datos(posts: List[Dict], usuarios: List[Dict], comentarios_por_post: Dict[int, int]) -> Dict[str, Any]:
+    """
+    Enriquece los posts y calcula las estadísticas en una sola pasada sobre los posts.
     
+    Los conteos por usuario se acumulan en un Counter mientras se recorren los posts,
+    así el coste es O(posts + usuarios) en lugar de recorrer todos los posts por cada usuario.
+    """
     # Crear un mapeo de usuarios por ID
     usuarios_map = {u["id"]: u for u in usuarios}
     
-    # Contar comentarios por post
-    comentarios_por_post = {}
-    for comentario in comentarios:
-        post_id = comentario["postId"]
-        if post_id not in comentarios_por_post:
-            comentarios_por_post[post_id] = 0
-        comentarios_por_post[post_id] += 1
+    posts_enriquecidos = []
+    posts_por_usuario = Counter()
+    suma_palabras_titulo = 0
+    suma_palabras_contenido = 0
+    post_mas_comentado = None
     
     # Enriquecer posts con información de usuario y comentarios
-    posts_enriquecidos = []
     for post in posts:
         usuario = usuarios_map.get(post["usuario_id"], {})
         post_enriquecido = {
@@ -171,24 +498,39 @@ def combinar_datos(posts: List[Dict], usuarios: List[Dict], comentarios: List[Di
             "total_comentarios": comentarios_por_post.get(post["id"], 0)
         }
         posts_enriquecidos.append(post_enriquecido)
+        
+        posts_por_usuario[post["usuario_id"]] += 1
+        suma_palabras_titulo += post["palabras_titulo"]
+        suma_palabras_contenido += post["palabras_contenido"]
+        # Con empate se conserva el primero, igual que max()
+        if post_mas_comentado is None or post_enriquecido["total_comentarios"] > post_mas_comentado["total_comentarios"]:
+            post_mas_comentado = post_enriquecido
     
     # Estadísticas generales
     estadisticas = {
         "total_posts": len(posts),
         "total_usuarios": len(usuarios),
-        "total_comentarios": len(comentarios),
-        "promedio_palabras_titulo": sum(p["palabras_titulo"] for p in posts) / len(posts),
-        "promedio_palabras_contenido": sum(p["palabras_contenido"] for p in posts) / len(posts),
-        "post_mas_comentado": max(posts_enriquecidos, key=lambda x: x["total_comentarios"]),
-        "usuario_mas_activo": max(usuarios_map.values(), key=lambda x: len([p for p in posts if p["usuario_id"] == x["id"]])),
+        "total_comentarios": sum(comentarios_por_post.values()),
+        "promedio_palabras_titulo": suma_palabras_titulo / len(posts),
+        "promedio_palabras_contenido": suma_palabras_contenido / len(posts),
+        "post_mas_comentado": post_mas_comentado,
+        "usuario_mas_activo": max(usuarios_map.values(), key=lambda x: posts_por_usuario[x["id"]]),
         "fecha_analisis": datetime.now().isoformat()
     }
     
-    resultado = {
+    return {
         "posts_enriquecidos": posts_enriquecidos,
         "usuarios": usuarios,
         "estadisticas": estadisticas
     }
+
+@task(cache_key_fn=clave_cache_sin_volatiles, cache_expiration=CACHE_TAREAS_EXPIRACION, persist_result=True)
+def combinar_datos(posts: List[Dict], usuarios: List[Dict], comentarios_por_post: Dict[int, int]) -> Dict[str, Any]:
+    """Combina y analiza todos los datos obtenidos (los comentarios llegan ya contados por post)"""
+    logger = get_run_logger()
+    logger.info("Combinando y analizando datos...")
+    
+    resultado = agregar_datos(posts, usuarios, comentarios_por_post)
     
     logger.info("Análisis de datos completado")
     return resultado
@@ -211,60 +553,264 @@ def guardar_json(datos: Any, nombre_archivo: str, directorio: str) -> str:
         logger.error(f"Error al guardar archivo {ruta_archivo}: {e}")
         raise
 
+def escribir_tabla(registros: List[Dict], ruta_base: str, formato: str = "json",
+                   compresion: Optional[str] = None) -> str:
+    """
+    Escribe una lista de registros en el formato indicado y devuelve la ruta final.
+    
+    compresion: "gzip" para json/jsonl; para parquet, cualquier códec de pyarrow
+    ("zstd", "snappy", "gzip", ...), zstd si no se indica; para arrow, "lz4" o "zstd".
+    """
+    if formato not in FORMATOS_SALIDA:
+        raise ValueError(f"Formato no soportado: {formato}. Opciones: {', '.join(FORMATOS_SALIDA)}")
+    if formato == "arrow" and compresion not in (None, *COMPRESIONES_ARROW):
+        raise ValueError(f"Compresión no soportada para arrow: {compresion}. Opciones: {', '.join(COMPRESIONES_ARROW)}")
+    
+    ruta_archivo = ruta_base + FORMATOS_SALIDA[formato]
+    
+    if formato in ("json", "json_compacto", "jsonl"):
+        if compresion not in (None, "gzip"):
+            raise ValueError(f"Compresión no soportada para {formato}: {compresion}")
+        if compresion == "gzip":
+            ruta_archivo += ".gz"
+            archivo = gzip.open(ruta_archivo, 'wt', encoding='utf-8')
+        else:
+            archivo = open(ruta_archivo, 'w', encoding='utf-8')
+        
+        with archivo:
+            if formato == "json":
+                json.dump(registros, archivo, indent=2, ensure_ascii=False)
+            elif formato == "json_compacto":
+                json.dump(registros, archivo, separators=(',', ':'), ensure_ascii=False)
+            else:
+                for registro in registros:
+                    archivo.write(json.dumps(registro, ensure_ascii=False) + "\n")
+        return ruta_archivo
+    
+    if not PYARROW_AVAILABLE:
+        raise ImportError("pyarrow no está instalado. Instalar con: pip install pyarrow")
+    
+    tabla = pa.Table.from_pylist(registros)
+    
+    if formato == "parquet":
+        pyarrow.parquet.write_table(tabla, ruta_archivo, compression=compresion or "zstd")
+    else:
+        opciones = pyarrow.ipc.IpcWriteOptions(compression=compresion)
+        with pyarrow.ipc.new_file(ruta_archivo, tabla.schema, options=opciones) as escritor:
+            escritor.write_table(tabla)
+    
+    return ruta_archivo
+
 @task
-def generar_reporte_html(estadisticas: Dict, directorio: str) -> str:
-    """Genera un reporte HTML con las estadísticas"""
+def guardar_datos(registros: List[Dict], nombre_base: str, directorio: str,
+                  formato: str = "json", compresion: Optional[str] = None) -> str:
+    """Guarda una lista de registros en el formato elegido (json, json_compacto, jsonl, parquet, arrow)"""
     logger = get_run_logger()
     
-    html_content = f"""
-    <!DOCTYPE html>
-    <html lang="es">
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>Reporte de Análisis JSONPlaceholder</title>
-        <style>
-            body {{ font-family: Arial, sans-serif; margin: 40px; background-color: #f5f5f5; }}
-            .container {{ background: white; padding: 30px; border-radius: 10px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }}
-            h1 {{ color: #333; border-bottom: 3px solid #4CAF50; padding-bottom: 10px; }}
-            .stat {{ background: #e8f5e8; padding: 15px; margin: 10px 0; border-radius: 5px; }}
-            .highlight {{ background: #fff3cd; padding: 10px; border-left: 4px solid #ffc107; }}
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <h1>📊 Reporte de Análisis - JSONPlaceholder</h1>
-            <p><strong>Fecha de análisis:</strong> {estadisticas['fecha_analisis']}</p>
-            
-            <h2>📈 Estadísticas Generales</h2>
-            <div class="stat"><strong>Total de Posts:</strong> {estadisticas['total_posts']}</div>
-            <div class="stat"><strong>Total de Usuarios:</strong> {estadisticas['total_usuarios']}</div>
-            <div class="stat"><strong>Total de Comentarios:</strong> {estadisticas['total_comentarios']}</div>
-            <div class="stat"><strong>Promedio de palabras en títulos:</strong> {estadisticas['promedio_palabras_titulo']:.1f}</div>
-            <div class="stat"><strong>Promedio de palabras en contenido:</strong> {estadisticas['promedio_palabras_contenido']:.1f}</div>
-            
-            <h2>🏆 Destacados</h2>
-            <div class="highlight">
-                <strong>Post más comentado:</strong><br>
-                "{estadisticas['post_mas_comentado']['titulo']}" 
-                ({estadisticas['post_mas_comentado']['total_comentarios']} comentarios)
-            </div>
-            
-            <div class="highlight">
-                <strong>Usuario más activo:</strong><br>
-                {estadisticas['usuario_mas_activo']['nombre']} 
-                ({estadisticas['usuario_mas_activo']['email']})
-            </div>
+    ruta_base = os.path.join(directorio, nombre_base)
+    
+    try:
+        ruta_archivo = escribir_tabla(registros, ruta_base, formato, compresion)
+        logger.info(f"Archivo guardado exitosamente: {ruta_archivo}")
+        return ruta_archivo
+    
+    except Exception as e:
+        logger.error(f"Error al guardar {ruta_base} ({formato}): {e}")
+        raise
+
+class PlantillaCompilada:
+    """
+    Plantilla con marcadores {campo} que se analiza una sola vez.
+    
+    renderizar solo concatena los fragmentos literales con los valores escapados como HTML,
+    sin volver a interpretar el texto de la plantilla en cada fila. Un campo ausente queda vacío.
+    """
+    
+    def __init__(self, texto: str):
+        self.partes = []
+        for literal, campo, formato, _ in Formatter().parse(texto):
+            self.partes.append((literal, campo, formato or ""))
+    
+    def renderizar(self, valores: Dict[str, Any]) -> str:
+        salida = []
+        for literal, campo, formato in self.partes:
+            salida.append(literal)
+            if campo is not None:
+                salida.append(escape(format(valores.get(campo, ""), formato)))
+        return "".join(salida)
+
+_PLANTILLA_CABECERA = PlantillaCompilada("""<!DOCTYPE html>
+<html lang="es">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Reporte de Análisis JSONPlaceholder</title>
+    <style>
+        body {{ font-family: Arial, sans-serif; margin: 40px; background-color: #f5f5f5; }}
+        .container {{ background: white; padding: 30px; border-radius: 10px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }}
+        h1 {{ color: #333; border-bottom: 3px solid #4CAF50; padding-bottom: 10px; }}
+        .stat {{ background: #e8f5e8; padding: 15px; margin: 10px 0; border-radius: 5px; }}
+        .highlight {{ background: #fff3cd; padding: 10px; border-left: 4px solid #ffc107; }}
+        table {{ border-collapse: collapse; width: 100%; margin: 10px 0; font-size: 14px; }}
+        th, td {{ border: 1px solid #ddd; padding: 6px 8px; text-align: left; }}
+        th {{ background: #4CAF50; color: white; }}
+        .paginacion {{ margin: 10px 0; }}
+        .paginacion button {{ margin-right: 5px; }}
+    </style>
+</head>
+<body>
+    <div class="container">
+        <h1>📊 Reporte de Análisis - JSONPlaceholder</h1>
+        <p><strong>Fecha de análisis:</strong> {fecha_analisis}</p>
+        
+        <h2>📈 Estadísticas Generales</h2>
+        <div class="stat"><strong>Total de Posts:</strong> {total_posts}</div>
+        <div class="stat"><strong>Total de Usuarios:</strong> {total_usuarios}</div>
+        <div class="stat"><strong>Total de Comentarios:</strong> {total_comentarios}</div>
+        <div class="stat"><strong>Promedio de palabras en títulos:</strong> {promedio_palabras_titulo:.1f}</div>
+        <div class="stat"><strong>Promedio de palabras en contenido:</strong> {promedio_palabras_contenido:.1f}</div>
+        
+        <h2>🏆 Destacados</h2>
+        <div class="highlight">
+            <strong>Post más comentado:</strong><br>
+            "{post_titulo}" 
+            ({post_comentarios} comentarios)
+        </div>
+        
+        <div class="highlight">
+            <strong>Usuario más activo:</strong><br>
+            {usuario_nombre} 
+            ({usuario_email})
+        </div>
+""")
+
+_PLANTILLA_INICIO_TABLA = PlantillaCompilada("""
+        <h2>{titulo}</h2>
+        <table id="{id_tabla}">
+""")
+
+_PLANTILLA_FIN_TABLA = PlantillaCompilada("""        </table>
+        <div class="paginacion" data-tabla="{id_tabla}" data-paginas="{paginas}">
+            <button type="button" data-paso="-1">◀ Anterior</button>
+            <span>Página <span class="actual">1</span> de {paginas}</span>
+            <button type="button" data-paso="1">Siguiente ▶</button>
         </div>
-    </body>
-    </html>
+""")
+
+_PLANTILLA_FILA_POST = PlantillaCompilada(
+    "<tr><td>{id}</td><td>{titulo}</td><td>{autor_nombre}</td><td>{autor_ciudad}</td>"
+    "<td>{palabras_contenido}</td><td>{total_comentarios}</td></tr>\n"
+)
+
+_PLANTILLA_FILA_USUARIO = PlantillaCompilada(
+    "<tr><td>{id}</td><td>{nombre}</td><td>{username}</td><td>{email}</td>"
+    "<td>{ciudad}</td><td>{empresa}</td><td>{total_posts}</td></tr>\n"
+)
+
+# Solo se muestra una página (<tbody>) de cada tabla a la vez
+_PIE_REPORTE = """    </div>
+    <script>
+        document.querySelectorAll(".paginacion").forEach(function (nav) {
+            var tabla = document.getElementById(nav.dataset.tabla);
+            var paginas = tabla.tBodies;
+            var actual = 0;
+            nav.querySelectorAll("button").forEach(function (boton) {
+                boton.addEventListener("click", function () {
+                    var siguiente = actual + parseInt(boton.dataset.paso, 10);
+                    if (siguiente < 0 || siguiente >= paginas.length) return;
+                    paginas[actual].hidden = true;
+                    paginas[siguiente].hidden = false;
+                    actual = siguiente;
+                    nav.querySelector(".actual").textContent = actual + 1;
+                });
+            });
+        });
+    </script>
+</body>
+</html>
+"""
+
+ENCABEZADOS_POSTS = ["ID", "Título", "Autor", "Ciudad", "Palabras", "Comentarios"]
+ENCABEZADOS_USUARIOS = ["ID", "Nombre", "Usuario", "Email", "Ciudad", "Empresa", "Posts"]
+
+def escribir_tabla_paginada(archivo, titulo: str, id_tabla: str, encabezados: List[str],
+                            filas: Iterable[Dict], plantilla_fila: PlantillaCompilada,
+                            filas_por_pagina: int = FILAS_POR_PAGINA_REPORTE) -> int:
+    """
+    Escribe una tabla HTML página a página: cada página es un <tbody> que se vuelca
+    al archivo en cuanto se completa, así en memoria solo hay una página renderizada.
+    Devuelve el número de filas escritas.
     """
+    archivo.write(_PLANTILLA_INICIO_TABLA.renderizar({"titulo": titulo, "id_tabla": id_tabla}))
+    archivo.write("<thead><tr>" + "".join(f"<th>{escape(e)}</th>" for e in encabezados) + "</tr></thead>\n")
+    
+    total = 0
+    paginas = 0
+    bloque = []
+    for fila in filas:
+        bloque.append(plantilla_fila.renderizar(fila))
+        total += 1
+        if len(bloque) == filas_por_pagina:
+            archivo.write(f'<tbody{" hidden" if paginas else ""}>\n{"".join(bloque)}</tbody>\n')
+            paginas += 1
+            bloque = []
+    
+    if bloque or not paginas:
+        archivo.write(f'<tbody{" hidden" if paginas else ""}>\n{"".join(bloque)}</tbody>\n')
+        paginas += 1
+    
+    archivo.write(_PLANTILLA_FIN_TABLA.renderizar({"id_tabla": id_tabla, "paginas": paginas}))
+    return total
+
+def escribir_reporte_html(archivo, estadisticas: Dict, posts: Optional[Iterable[Dict]] = None,
+                          usuarios: Optional[Iterable[Dict]] = None,
+                          filas_por_pagina: int = FILAS_POR_PAGINA_REPORTE) -> None:
+    """
+    Renderiza el reporte completo sobre un archivo abierto, en streaming.
+    
+    posts y usuarios pueden ser cualquier iterable (incluso generadores): se recorren una vez.
+    Los posts por usuario se cuentan mientras se escribe la tabla de posts.
+    """
+    post_mas_comentado = estadisticas["post_mas_comentado"]
+    usuario_mas_activo = estadisticas["usuario_mas_activo"]
+    archivo.write(_PLANTILLA_CABECERA.renderizar({
+        **estadisticas,
+        "post_titulo": post_mas_comentado["titulo"],
+        "post_comentarios": post_mas_comentado["total_comentarios"],
+        "usuario_nombre": usuario_mas_activo["nombre"],
+        "usuario_email": usuario_mas_activo["email"]
+    }))
+    
+    posts_por_usuario = Counter()
+    
+    def contar_posts(filas: Iterable[Dict]) -> Iterator[Dict]:
+        for fila in filas:
+            posts_por_usuario[fila["usuario_id"]] += 1
+            yield fila
+    
+    if posts is not None:
+        escribir_tabla_paginada(archivo, "📝 Posts", "tabla-posts", ENCABEZADOS_POSTS,
+                                contar_posts(posts), _PLANTILLA_FILA_POST, filas_por_pagina)
+    
+    if usuarios is not None:
+        filas_usuarios = ({**usuario, "total_posts": posts_por_usuario[usuario["id"]]} for usuario in usuarios)
+        escribir_tabla_paginada(archivo, "👥 Usuarios", "tabla-usuarios", ENCABEZADOS_USUARIOS,
+                                filas_usuarios, _PLANTILLA_FILA_USUARIO, filas_por_pagina)
+    
+    archivo.write(_PIE_REPORTE)
+
+@task
+def generar_reporte_html(estadisticas: Dict, directorio: str, posts: Optional[Iterable[Dict]] = None,
+                         usuarios: Optional[Iterable[Dict]] = None,
+                         filas_por_pagina: int = FILAS_POR_PAGINA_REPORTE) -> str:
+    """Genera un reporte HTML con las estadísticas y, si se pasan, tablas paginadas de posts y usuarios"""
+    logger = get_run_logger()
     
     ruta_reporte = os.path.join(directorio, "reporte_analisis.html")
     
     try:
-        with open(ruta_reporte, 'w', encoding='utf-8') as file:
-            file.write(html_content)
+        with open(ruta_reporte, 'w', encoding='utf-8', buffering=TAMANO_BUFFER_REPORTE) as file:
+            escribir_reporte_html(file, estadisticas, posts, usuarios, filas_por_pagina)
         
         logger.info(f"Reporte HTML generado: {ruta_reporte}")
         return ruta_reporte
@@ -274,10 +820,13 @@ def generar_reporte_html(estadisticas: Dict, directorio: str) -> str:
         raise
 
 # Flujo principal
-@flow
-def pipeline_jsonplaceholder():
+@flow(task_runner=ThreadPoolTaskRunner())
+def pipeline_jsonplaceholder(tamano_pagina: int = TAMANO_PAGINA, formato_salida: str = "json",
+                             compresion: Optional[str] = None):
     """
     Pipeline principal para procesar datos de JSONPlaceholder
+    
+    formato_salida: json (por defecto), json_compacto, jsonl, parquet o arrow.
     """
     logger = get_run_logger()
     logger.info("🚀 Iniciando pipeline de JSONPlaceholder")
@@ -285,29 +834,35 @@ def pipeline_jsonplaceholder():
     # Paso 1: Preparar directorio
     directorio = crear_directorio_datos()
     
-    # Paso 2: Obtener datos (en paralelo)
-    posts_raw = obtener_posts()
-    usuarios_raw = obtener_usuarios()
-    comentarios_raw = obtener_comentarios()
-    
-    # Paso 3: Procesar datos
-    posts_procesados = procesar_posts(posts_raw)
-    usuarios_procesados = procesar_usuarios(usuarios_raw)
+    # Pasos 2 y 3: Obtener y procesar datos (en paralelo).
+    # Posts y comentarios se leen por páginas y se procesan lote a lote al llegar.
+    posts_procesados_futuro = obtener_y_procesar_posts.submit(tamano_pagina)
+    comentarios_futuro = contar_comentarios_por_post.submit(tamano_pagina)
+    usuarios_futuro = obtener_usuarios.submit()
+    usuarios_procesados_futuro = procesar_usuarios.submit(usuarios_futuro)
     
     # Paso 4: Combinar y analizar
-    datos_combinados = combinar_datos(posts_procesados, usuarios_procesados, comentarios_raw)
+    datos_combinados = combinar_datos(
+        posts_procesados_futuro.result(),
+        usuarios_procesados_futuro.result(),
+        comentarios_futuro.result()
+    )
     
-    # Paso 5: Guardar archivos JSON
-    archivo_posts = guardar_json(
+    # Paso 5: Guardar archivos (las tablas en el formato elegido, las estadísticas siempre en JSON)
+    archivo_posts = guardar_datos(
         datos_combinados["posts_enriquecidos"], 
-        "posts_enriquecidos.json", 
-        directorio
+        "posts_enriquecidos", 
+        directorio,
+        formato_salida,
+        compresion
     )
     
-    archivo_usuarios = guardar_json(
+    archivo_usuarios = guardar_datos(
         datos_combinados["usuarios"], 
-        "usuarios_procesados.json", 
-        directorio
+        "usuarios_procesados", 
+        directorio,
+        formato_salida,
+        compresion
     )
     
     archivo_estadisticas = guardar_json(
@@ -317,7 +872,12 @@ def pipeline_jsonplaceholder():
     )
     
     # Paso 6: Generar reporte HTML
-    reporte_html = generar_reporte_html(datos_combinados["estadisticas"], directorio)
+    reporte_html = generar_reporte_html(
+        datos_combinados["estadisticas"],
+        directorio,
+        datos_combinados["posts_enriquecidos"],
+        datos_combinados["usuarios"]
+    )
     
     # Resultado final
     resultado = {
@@ -0,0 +1,172 @@
+"""
+Pruebas del pipeline de JSONPlaceholder contra un servidor local
+- Concurrencia: cada endpoint tarda DEMORA segundos en responder; si las descargas de usuarios,
+  posts y comentarios se hacen en paralelo, el total se parece a la más lenta y no a la suma.
+- Caché: revalidación con ETag (304) y reutilización del resultado de una tarea ya ejecutada.
+
+Uso:
+    python -m pytest -q test_prefect_json_example.py
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from prefect import flow
+
+import prefect_json_example as pipeline
+
+DEMORA = 1.0  # segundos por respuesta
+
+def _datos_stub(marca: str):
+    # La marca cambia los datos en cada ejecución: así la caché de tareas de Prefect no responde por el servidor
+    usuarios = [{
+        "id": i, "name": f"Usuario {i}", "username": f"usuario{i}", "email": f"usuario{i}@ejemplo.com",
+        "phone": "555-0100", "website": "ejemplo.com",
+        "address": {"city": "Ciudad", "zipcode": "00000"}, "company": {"name": "Empresa"}
+    } for i in range(1, 4)]
+    posts = [{"userId": (i % 3) + 1, "id": i, "title": f"titulo {i} {marca}", "body": f"contenido del post {i}"}
+             for i in range(1, 6)]
+    comentarios = [{"postId": (i % 5) + 1, "id": i, "name": "n", "email": "e", "body": marca} for i in range(1, 11)]
+    return {"/users": usuarios, "/posts": posts, "/comments": comentarios}
+
+class ServidorLento(BaseHTTPRequestHandler):
+    """Sirve los datos de prueba con ?_page/_limit, ETag y X-Total-Count, tardando demora en cada respuesta"""
+    protocol_version = "HTTP/1.1"
+    datos = {}
+    demora = DEMORA
+    # (ruta, código) de cada petición atendida
+    peticiones = []
+    
+    def log_message(self, *args):
+        pass
+    
+    def do_GET(self):
+        url = urlparse(self.path)
+        datos = self.datos.get(url.path)
+        if datos is None:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        
+        time.sleep(self.demora)
+        total = len(datos)
+        params = parse_qs(url.query)
+        if "_page" in params:
+            limite = int(params["_limit"][0])
+            pagina = int(params["_page"][0])
+            datos = datos[(pagina - 1) * limite:pagina * limite]
+        
+        cuerpo = json.dumps(datos).encode()
+        etag = '"' + hashlib.sha256(cuerpo).hexdigest()[:16] + '"'
+        if self.headers.get("If-None-Match") == etag:
+            self.peticiones.append((self.path, 304))
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        
+        self.peticiones.append((self.path, 200))
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("ETag", etag)
+        self.send_header("X-Total-Count", str(total))
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+@flow(task_runner=pipeline.ThreadPoolTaskRunner())
+def descargar_en_paralelo():
+    """Lanza las tres descargas como en pipeline_jsonplaceholder y mide cuánto tardan juntas"""
+    inicio = time.perf_counter()
+    posts_futuro = pipeline.obtener_y_procesar_posts.submit()
+    comentarios_futuro = pipeline.contar_comentarios_por_post.submit()
+    usuarios_futuro = pipeline.obtener_usuarios.submit()
+    resultados = (posts_futuro.result(), comentarios_futuro.result(), usuarios_futuro.result())
+    return time.perf_counter() - inicio, resultados
+
+@flow
+def procesar_posts_una_vez():
+    """Una ejecución de la tarea de posts; devuelve su estado (Completed o Cached)"""
+    return pipeline.obtener_y_procesar_posts(return_state=True)
+
+class ConServidorLocal(unittest.TestCase):
+    """Levanta el servidor de prueba y apunta el pipeline a él, con una caché HTTP temporal"""
+    demora = DEMORA
+    ttl = pipeline.HTTP_CACHE_TTL
+    
+    def setUp(self):
+        ServidorLento.datos = _datos_stub(uuid.uuid4().hex)
+        ServidorLento.demora = self.demora
+        ServidorLento.peticiones = []
+        self.servidor = ThreadingHTTPServer(("127.0.0.1", 0), ServidorLento)
+        threading.Thread(target=self.servidor.serve_forever, daemon=True).start()
+        
+        self.directorio = tempfile.TemporaryDirectory()
+        self.base_url_original = pipeline.BASE_URL
+        self.cache_original = pipeline._cache_http
+        pipeline.BASE_URL = f"http://127.0.0.1:{self.servidor.server_address[1]}"
+        pipeline._cache_http = pipeline.CacheHTTP(self.directorio.name, ttl=self.ttl)
+    
+    def tearDown(self):
+        pipeline.BASE_URL = self.base_url_original
+        pipeline._cache_http = self.cache_original
+        self.servidor.shutdown()
+        self.servidor.server_close()
+        self.directorio.cleanup()
+
+class TestDescargaConcurrente(ConServidorLocal):
+    
+    def test_latencia_es_la_de_la_descarga_mas_lenta(self):
+        duracion, (posts, comentarios, usuarios) = descargar_en_paralelo()
+        
+        self.assertEqual(len(posts), 5)
+        self.assertEqual(sum(comentarios.values()), 10)
+        self.assertEqual(len(usuarios), 3)
+        
+        # En serie serían al menos 3 * DEMORA
+        self.assertGreaterEqual(duracion, DEMORA)
+        self.assertLess(duracion, 2 * DEMORA)
+
+class TestCacheHTTP(ConServidorLocal):
+    demora = 0
+    # Sin TTL: cada lectura revalida con el servidor
+    ttl = 0
+    
+    def test_revalidacion_con_304_reutiliza_el_cuerpo(self):
+        primera = pipeline.obtener_json("users")
+        segunda = pipeline.obtener_json("users")
+        
+        self.assertEqual(primera, segunda)
+        self.assertEqual([codigo for _, codigo in ServidorLento.peticiones], [200, 304])
+    
+    def test_segunda_ejecucion_reutiliza_el_resultado_de_la_tarea(self):
+        primera = procesar_posts_una_vez()
+        ServidorLento.peticiones = []
+        segunda = procesar_posts_una_vez()
+        
+        self.assertEqual(primera.name, "Completed")
+        self.assertEqual(segunda.name, "Cached")
+        self.assertEqual(primera.result(), segunda.result())
+        # La clave solo revalida la primera página; la tarea no vuelve a recorrer el recurso
+        self.assertEqual(ServidorLento.peticiones, [("/posts?_page=1&_limit=100", 304)])
+    
+    def test_purgar_respeta_el_tamano_maximo(self):
+        cache = pipeline.CacheHTTP(os.path.join(self.directorio.name, "limitada"), tamano_maximo=0)
+        pipeline._cache_http = cache
+        pipeline.obtener_json("users")
+        
+        self.assertEqual(cache.purgar(), 1)
+        self.assertEqual(os.listdir(cache.directorio), [])
+
+if __name__ == "__main__":
+    unittest.main()
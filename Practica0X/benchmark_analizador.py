@@ -0,0 +1,381 @@
+"""
+Benchmark del Analizador Multi-Documento
+========================================
+
+Genera un corpus sintético reproducible (PDFs con fitz, DOCX con python-docx y código
+fuente en cada lenguaje soportado), mide cada método extraer_*/analizar_* y el proceso
+completo procesar_multiples_archivos, y guarda archivos/s, MB/s y el pico de RSS en un
+JSON de resultados. Si existe una línea base, compara contra ella y marca las regresiones.
+
+Cada etapa se ejecuta en un proceso nuevo para que el pico de RSS sea el de esa etapa.
+También se mide el tiempo de importación del analizador (python -X importtime), que no
+debe cargar PyMuPDF ni python-docx hasta que se analiza un PDF o un DOCX.
+
+Uso:
+    python benchmark_analizador.py                          # corpus por defecto
+    python benchmark_analizador.py --guardar-linea-base     # fija los resultados como línea base
+    python benchmark_analizador.py --pdfs 20 --paginas 50 --workers 1 4
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from multi_document_analyzer import DocumentAnalyzer, LENGUAJES_CODIGO, cargar_backend
+
+ARCHIVO_RESULTADOS = "benchmark_resultados.json"
+ARCHIVO_LINEA_BASE = "benchmark_linea_base.json"
+TOLERANCIA = 0.10  # Caída de archivos/s admitida antes de marcar una regresión
+# Módulos de los backends opcionales que no deben cargarse al importar el analizador
+MODULOS_BACKEND = ("fitz", "pymupdf", "docx")
+
+_PALABRAS = ("análisis documento datos proceso resultado archivo sistema función clase módulo "
+             "página texto índice caché rendimiento memoria tiempo usuario servidor red").split()
+
+# ---------------------------------------------------------------------------
+# Corpus sintético
+# ---------------------------------------------------------------------------
+
+def _frase(aleatorio: random.Random, palabras: int = 12) -> str:
+    return " ".join(aleatorio.choice(_PALABRAS) for _ in range(palabras)).capitalize() + "."
+
+def generar_pdf(ruta: str, paginas: int, aleatorio: random.Random):
+    import fitz
+    documento = fitz.open()
+    for _ in range(paginas):
+        pagina = documento.new_page()
+        texto = "\n".join(_frase(aleatorio) for _ in range(40))
+        pagina.insert_textbox(fitz.Rect(50, 50, 550, 800), texto, fontsize=9)
+    documento.save(ruta)
+    documento.close()
+
+def generar_docx(ruta: str, parrafos: int, aleatorio: random.Random):
+    from docx import Document
+    documento = Document()
+    documento.add_heading(_frase(aleatorio, 4), level=1)
+    for _ in range(parrafos):
+        documento.add_paragraph(" ".join(_frase(aleatorio) for _ in range(4)))
+    tabla = documento.add_table(rows=10, cols=4)
+    for fila in tabla.rows:
+        for celda in fila.cells:
+            celda.text = aleatorio.choice(_PALABRAS)
+    documento.save(ruta)
+
+# Un bloque representativo por lenguaje: imports, comentarios, cadenas, clases y funciones
+_PLANTILLAS_CODIGO = {
+    '.py': ('import os\nfrom typing import List\n\n'
+            'class Clase{i}:\n    """Docstring {i}"""\n\n'
+            '    def metodo_{i}(self, valor: int) -> List[int]:\n'
+            '        # comentario {i}\n        return [valor, "{i}"]\n\n'
+            'async def funcion_{i}(a, b=2):\n    return a + b\n\n'),
+    '.js': ('import {{ modulo{i} }} from "./modulo{i}";\nconst dep{i} = require("dep{i}");\n'
+            '/* bloque {i} */\nclass Clase{i} {{\n  metodo() {{ return `plantilla {i}`; }}\n}}\n'
+            'function funcion{i}(a, b) {{\n  // comentario\n  return a + b + "{i}";\n}}\n\n'),
+    '.ts': ('import {{ Tipo{i} }} from "./tipo{i}";\n'
+            'interface Interfaz{i} {{ valor: number; }}\n'
+            'class Clase{i} {{\n  public metodo{i}(x: number): number {{ return x; }}\n}}\n'
+            'function funcion{i}(a: string): string {{\n  // comentario\n  return a + "{i}";\n}}\n\n'),
+    '.java': ('import java.util.List;\n/** Documentación {i} */\n'
+              'public class Clase{i} {{\n'
+              '    public static int metodo{i}(int a) {{\n        // comentario\n        return a * {i};\n    }}\n'
+              '    private String texto{i}() {{ return "{i}"; }}\n}}\n\n'),
+    '.cpp': ('#include <vector>\n#include "modulo{i}.h"\nusing namespace std;\n'
+             '// comentario {i}\nclass Clase{i} {{\npublic:\n    int metodo(int a) {{ return a + {i}; }}\n}};\n\n'),
+    '.c': ('#include <stdio.h>\n#include "modulo{i}.h"\n/* bloque {i} */\n'
+           'int funcion_{i}(int a) {{\n    // comentario\n    printf("%d", a);\n    return a;\n}}\n\n'),
+    '.cs': ('using System.Collections.Generic;\n'
+            'public interface IInterfaz{i} {{ }}\n'
+            'public class Clase{i} {{\n    public async Task<int> Metodo{i}(int a) {{\n'
+            '        // comentario\n        return a + {i};\n    }}\n}}\n\n'),
+    '.php': ('<?php\nrequire_once("modulo{i}.php");\n# comentario {i}\n'
+             'class Clase{i} {{\n    public function metodo{i}($a) {{ return "{i}" . $a; }}\n}}\n'
+             'function funcion{i}($a) {{\n    // comentario\n    return $a;\n}}\n?>\n\n'),
+    '.rb': ('require "modulo{i}"\n# comentario {i}\n'
+            'class Clase{i}\n  def metodo_{i}(a)\n    "valor #{{a}}"\n  end\nend\n\n'),
+    '.go': ('import "fmt"\n// comentario {i}\n'
+            'type Estructura{i} struct {{ valor int }}\n'
+            'func (e *Estructura{i}) Metodo{i}(a int) int {{\n    fmt.Println(`cruda {i}`)\n    return a\n}}\n\n'),
+}
+
+def generar_codigo(ruta: str, extension: str, bloques: int):
+    plantilla = _PLANTILLAS_CODIGO[extension]
+    with open(ruta, 'w', encoding='utf-8') as archivo:
+        for i in range(bloques):
+            archivo.write(plantilla.format(i=i))
+
+def generar_corpus(directorio: str, pdfs: int = 5, paginas: int = 20, docx: int = 5,
+                   archivos_codigo: int = 10, bloques_codigo: int = 50, semilla: int = 42) -> Dict[str, List[str]]:
+    """Crea el corpus en directorio y devuelve las rutas por grupo (pdf, docx y una entrada por extensión)"""
+    aleatorio = random.Random(semilla)
+    corpus = {"pdf": [], "docx": []}
+    os.makedirs(directorio, exist_ok=True)
+    
+    # Los backends se cargan aquí y no al importar: las etapas se ejecutan en procesos nuevos
+    # que importan este módulo, y su pico de RSS no debe incluir PyMuPDF ni python-docx
+    if cargar_backend("pdf") is not None:
+        for n in range(pdfs):
+            ruta = os.path.join(directorio, f"documento_{n}.pdf")
+            generar_pdf(ruta, paginas, aleatorio)
+            corpus["pdf"].append(ruta)
+    
+    if cargar_backend("docx") is not None:
+        for n in range(docx):
+            ruta = os.path.join(directorio, f"documento_{n}.docx")
+            generar_docx(ruta, paginas * 10, aleatorio)
+            corpus["docx"].append(ruta)
+    
+    for extension in ['.py'] + list(LENGUAJES_CODIGO):
+        carpeta = os.path.join(directorio, "src_" + extension.lstrip('.'))
+        os.makedirs(carpeta, exist_ok=True)
+        corpus[extension] = []
+        for n in range(archivos_codigo):
+            ruta = os.path.join(carpeta, f"modulo_{n}{extension}")
+            generar_codigo(ruta, extension, bloques_codigo)
+            corpus[extension].append(ruta)
+    
+    return corpus
+
+# ---------------------------------------------------------------------------
+# Medición
+# ---------------------------------------------------------------------------
+
+def _vmhwm_kb() -> Optional[int]:
+    """Pico de RSS del espacio de memoria actual según /proc (solo Linux)"""
+    try:
+        with open("/proc/self/status", encoding="ascii") as status:
+            for linea in status:
+                if linea.startswith("VmHWM:"):
+                    return int(linea.split()[1])
+    except (OSError, ValueError):
+        pass
+    return None
+
+def _pico_rss_mb() -> Optional[float]:
+    """Pico de RSS del proceso actual y sus hijos terminados, en MB
+    
+    En Linux getrusage conserva tras exec el máximo del proceso que lanzó la etapa (el que generó
+    el corpus), así que para el proceso actual se prefiere VmHWM, que empieza de cero.
+    """
+    if resource is None:
+        return None
+    propio = _vmhwm_kb() or resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    pico = max(propio, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    # Linux informa en KB, macOS en bytes
+    return round(pico / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+def _metodo_etapa(analyzer: DocumentAnalyzer, etapa: str) -> Callable[[str], Any]:
+    if etapa == "extraer_texto_pdf":
+        return analyzer.extraer_texto_pdf
+    if etapa == "extraer_texto_docx":
+        return analyzer.extraer_texto_docx
+    if etapa == "analizar_codigo_python":
+        return analyzer.analizar_codigo_python
+    return analyzer.analizar_codigo_generico
+
+def _ejecutar_etapa(etapa: str, archivos: List[str], repeticiones: int, workers: int = 1) -> Dict[str, Any]:
+    """Mide una etapa (en un proceso propio); se conserva la mejor de las repeticiones"""
+    # procesar_multiples_archivos se ejecuta en otro directorio: las rutas relativas dejarían de existir
+    archivos = [os.path.abspath(archivo) for archivo in archivos]
+    bytes_totales = sum(os.path.getsize(a) for a in archivos)
+    tiempos = []
+    
+    # Los mensajes del analizador no forman parte de la medición
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeticiones):
+            analyzer = DocumentAnalyzer(workers=workers)
+            if etapa.startswith("procesar_multiples_archivos"):
+                salida = tempfile.mkdtemp(prefix="bench_salida_")
+                directorio_actual = os.getcwd()
+                os.chdir(salida)
+                try:
+                    inicio = time.perf_counter()
+                    analyzer.procesar_multiples_archivos(archivos)
+                    tiempos.append(time.perf_counter() - inicio)
+                finally:
+                    os.chdir(directorio_actual)
+                    shutil.rmtree(salida, ignore_errors=True)
+            else:
+                metodo = _metodo_etapa(analyzer, etapa)
+                inicio = time.perf_counter()
+                for archivo in archivos:
+                    metodo(archivo)
+                tiempos.append(time.perf_counter() - inicio)
+    
+    segundos = min(tiempos)
+    return {
+        "archivos": len(archivos),
+        "bytes": bytes_totales,
+        "segundos": round(segundos, 4),
+        "archivos_s": round(len(archivos) / segundos, 2) if segundos else None,
+        "mb_s": round(bytes_totales / (1024 * 1024) / segundos, 3) if segundos else None,
+        "rss_pico_mb": _pico_rss_mb()
+    }
+
+def definir_etapas(corpus: Dict[str, List[str]], workers: List[int]) -> Dict[str, tuple]:
+    """Nombre de etapa -> (archivos, workers)"""
+    etapas = {}
+    if corpus["pdf"]:
+        etapas["extraer_texto_pdf"] = (corpus["pdf"], 1)
+    if corpus["docx"]:
+        etapas["extraer_texto_docx"] = (corpus["docx"], 1)
+    etapas["analizar_codigo_python"] = (corpus[".py"], 1)
+    for extension, lenguaje in LENGUAJES_CODIGO.items():
+        etapas[f"analizar_codigo_generico[{lenguaje}]"] = (corpus[extension], 1)
+    
+    todos = [ruta for rutas in corpus.values() for ruta in rutas]
+    for n in workers:
+        etapas[f"procesar_multiples_archivos[workers={n}]"] = (todos, n)
+    return etapas
+
+def ejecutar_benchmark(corpus: Dict[str, List[str]], repeticiones: int = 3,
+                       workers: Optional[List[int]] = None) -> Dict[str, Dict[str, Any]]:
+    resultados = {}
+    # spawn: cada etapa arranca con un proceso limpio, sin heredar el pico de RSS del padre
+    contexto = multiprocessing.get_context("spawn")
+    for etapa, (archivos, n_workers) in definir_etapas(corpus, workers or [1]).items():
+        with ProcessPoolExecutor(max_workers=1, mp_context=contexto) as executor:
+            resultado = executor.submit(_ejecutar_etapa, etapa, archivos, repeticiones, n_workers).result()
+        resultados[etapa] = resultado
+        print(f"  {etapa:<48} {resultado['archivos_s']:>10} arch/s {resultado['mb_s']:>9} MB/s "
+              f"{resultado['rss_pico_mb']} MB")
+    return resultados
+
+def medir_importacion(modulo: str = "multi_document_analyzer", repeticiones: int = 3) -> Dict[str, Any]:
+    """Tiempo acumulado de importar modulo según -X importtime (mejor de varios procesos nuevos)"""
+    directorio = os.path.dirname(os.path.abspath(__file__))
+    mejor = None
+    for _ in range(repeticiones):
+        proceso = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+                                 cwd=directorio, capture_output=True, text=True, check=True)
+        # Formato: "import time: <propio us> | <acumulado us> | <módulo>" (la cabecera no es numérica)
+        importados = {}
+        for linea in proceso.stderr.splitlines():
+            partes = linea.replace("import time:", "", 1).split("|")
+            if len(partes) == 3 and partes[1].strip().isdigit():
+                importados[partes[2].strip()] = int(partes[1])
+        if modulo in importados and (mejor is None or importados[modulo] < mejor[0]):
+            mejor = (importados[modulo], importados)
+    
+    acumulado_us, importados = mejor
+    return {
+        "segundos": round(acumulado_us / 1_000_000, 4),
+        "modulos_importados": len(importados),
+        "backends_importados": sorted(m for m in importados if m.split('.')[0] in MODULOS_BACKEND)
+    }
+
+def _rendimiento(resultado: Dict[str, Any]) -> Optional[float]:
+    """Métrica comparable (mayor es mejor): archivos/s, o 1/segundos si la etapa no procesa archivos"""
+    if resultado.get("archivos_s"):
+        return resultado["archivos_s"]
+    if resultado.get("segundos"):
+        return 1 / resultado["segundos"]
+    return None
+
+def comparar_con_linea_base(resultados: Dict[str, Dict[str, Any]], linea_base: Dict[str, Any],
+                            tolerancia: float = TOLERANCIA) -> List[str]:
+    """Devuelve las etapas cuyo throughput cayó más que la tolerancia respecto a la línea base"""
+    regresiones = []
+    print("\n📏 Comparación con la línea base (archivos/s; segundos en la importación):")
+    for etapa, actual in resultados.items():
+        base = linea_base.get("resultados", {}).get(etapa)
+        if not base or not _rendimiento(base) or not _rendimiento(actual):
+            print(f"  {etapa:<48} (sin línea base)")
+            continue
+        cambio = _rendimiento(actual) / _rendimiento(base) - 1
+        marca = "⚠️ " if cambio < -tolerancia else "✅"
+        if cambio < -tolerancia:
+            regresiones.append(etapa)
+        clave = "archivos_s" if actual.get("archivos_s") else "segundos"
+        print(f"  {marca} {etapa:<46} {base[clave]:>10} → {actual[clave]:>10} ({cambio:+.1%})")
+    return regresiones
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de DocumentAnalyzer")
+    parser.add_argument("--pdfs", type=int, default=5, help="Número de PDFs")
+    parser.add_argument("--paginas", type=int, default=20, help="Páginas por PDF (y párrafos/10 por DOCX)")
+    parser.add_argument("--docx", type=int, default=5, help="Número de documentos DOCX")
+    parser.add_argument("--archivos-codigo", type=int, default=10, help="Archivos por lenguaje")
+    parser.add_argument("--bloques-codigo", type=int, default=50, help="Bloques de código por archivo")
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--repeticiones", type=int, default=3, help="Se conserva el mejor tiempo")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1],
+                        help="Valores de workers para procesar_multiples_archivos")
+    parser.add_argument("--corpus", default=None, help="Directorio del corpus (por defecto uno temporal)")
+    parser.add_argument("--salida", default=ARCHIVO_RESULTADOS)
+    parser.add_argument("--linea-base", default=ARCHIVO_LINEA_BASE)
+    parser.add_argument("--guardar-linea-base", action="store_true",
+                        help="Guarda estos resultados como nueva línea base")
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA)
+    args = parser.parse_args()
+    
+    directorio_corpus = os.path.abspath(args.corpus) if args.corpus else tempfile.mkdtemp(prefix="bench_corpus_")
+    try:
+        print(f"🧪 Generando corpus en {directorio_corpus}...")
+        corpus = generar_corpus(directorio_corpus, args.pdfs, args.paginas, args.docx,
+                                args.archivos_codigo, args.bloques_codigo, args.semilla)
+        
+        print("⏱️  Midiendo etapas:")
+        resultados = ejecutar_benchmark(corpus, args.repeticiones, args.workers)
+        
+        importacion = medir_importacion(repeticiones=args.repeticiones)
+        resultados["importacion[multi_document_analyzer]"] = importacion
+        print(f"  {'importacion[multi_document_analyzer]':<48} {importacion['segundos'] * 1000:.1f} ms "
+              f"({importacion['modulos_importados']} módulos)")
+        if importacion["backends_importados"]:
+            print(f"  ⚠️  La importación carga backends opcionales: {', '.join(importacion['backends_importados'])}")
+    finally:
+        if args.corpus is None:
+            shutil.rmtree(directorio_corpus, ignore_errors=True)
+    
+    informe = {
+        "fecha": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "cpus": os.cpu_count(),
+        "parametros": {clave: valor for clave, valor in vars(args).items()
+                       if clave not in ("salida", "linea_base", "guardar_linea_base", "corpus")},
+        "resultados": resultados
+    }
+    
+    with open(args.salida, 'w', encoding='utf-8') as f:
+        json.dump(informe, f, indent=2, ensure_ascii=False)
+    print(f"\n📊 Resultados guardados en {args.salida}")
+    
+    if args.guardar_linea_base:
+        with open(args.linea_base, 'w', encoding='utf-8') as f:
+            json.dump(informe, f, indent=2, ensure_ascii=False)
+        print(f"📌 Línea base guardada en {args.linea_base}")
+        return
+    
+    if os.path.exists(args.linea_base):
+        with open(args.linea_base, 'r', encoding='utf-8') as f:
+            linea_base = json.load(f)
+        if linea_base.get("parametros") != informe["parametros"]:
+            print("⚠️  La línea base se midió con otros parámetros; la comparación es orientativa")
+        regresiones = comparar_con_linea_base(resultados, linea_base, args.tolerancia)
+        if regresiones:
+            print(f"\n❌ Regresiones detectadas: {', '.join(regresiones)}")
+            sys.exit(1)
+    else:
+        print(f"ℹ️  Sin línea base ({args.linea_base}); crear una con --guardar-linea-base")
+
+if __name__ == "__main__":
+    main()
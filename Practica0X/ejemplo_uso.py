@@ -6,7 +6,9 @@ Este script demuestra cómo usar el analizador para procesar
 archivos PDF, DOC y código fuente automáticamente.
 """
 
-from multi_document_analyzer import DocumentAnalyzer
+from multi_document_analyzer import DocumentAnalyzer, manejadores_registrados
+from escaner_archivos import escanear_directorio
+import itertools
 import os
 
 def ejemplo_analisis_completo():
@@ -18,38 +20,32 @@ def ejemplo_analisis_completo():
     # Crear instancia del analizador
     analyzer = DocumentAnalyzer()
     
-    # Lista de archivos a analizar (ajusta según tus archivos)
-    archivos_a_analizar = []
-    
-    # Buscar archivos automáticamente en el directorio actual
-    directorio_actual = os.getcwd()
-    
-    for archivo in os.listdir(directorio_actual):
-        extension = os.path.splitext(archivo)[1].lower()
-        
-        # Agregar archivos soportados
-        if extension in ['.pdf', '.docx', '.doc', '.py', '.js', '.ts', 
-                        '.java', '.cpp', '.c', '.cs', '.php', '.rb', '.go']:
-            # Evitar analizar el propio script analizador
-            if archivo not in ['multi_document_analyzer.py', 'ejemplo_uso.py']:
-                archivos_a_analizar.append(archivo)
-    
-    if not archivos_a_analizar:
+    # Buscar archivos automáticamente en el árbol del directorio actual.
+    # El escáner es un generador: el análisis empieza mientras se siguen descubriendo archivos.
+    # Se evita analizar el propio analizador y sus scripts auxiliares.
+    archivos_encontrados = escanear_directorio(
+        os.curdir,
+        excluir=['multi_document_analyzer.py', 'escaner_archivos.py', 'ejemplo_uso.py',
+                 'instrumentacion.py', 'benchmark_analizador.py', 'indice_documentos.py', 'test_*.py']
+    )
+    
+    primer_archivo = next(archivos_encontrados, None)
+    if primer_archivo is None:
         print("⚠️  No se encontraron archivos para analizar en el directorio actual")
         print("\nArchivos soportados:")
-        print("- PDF: .pdf")
-        print("- Documentos: .docx, .doc") 
-        print("- Código: .py, .js, .ts, .java, .cpp, .c, .cs, .php, .rb, .go")
+        for manejador in manejadores_registrados():
+            print(f"- {manejador.nombre}: {', '.join(manejador.extensiones)}")
         return
     
-    print(f"📁 Archivos encontrados para análisis: {len(archivos_a_analizar)}")
-    for archivo in archivos_a_analizar:
-        print(f"  ✓ {archivo}")
+    def mostrar_encontrados():
+        for archivo in itertools.chain([primer_archivo], archivos_encontrados):
+            print(f"  ✓ {archivo}")
+            yield archivo
     
     print("\n🚀 Iniciando procesamiento...")
     
     # Procesar todos los archivos
-    readme_generado = analyzer.procesar_multiples_archivos(archivos_a_analizar)
+    readme_generado = analyzer.procesar_multiples_archivos(mostrar_encontrados())
     
     print(f"\n✅ Análisis completado!")
     print(f"📄 README generado: {readme_generado}")
@@ -103,7 +99,7 @@ if __name__ == "__main__":
     
     # Preguntar qué tipo de análisis hacer
     print("\nOpciones disponibles:")
-    print("1. Análisis automático (buscar archivos en directorio actual)")
+    print("1. Análisis automático (buscar archivos en el árbol del directorio actual)")
     print("2. Análisis de archivos específicos")
     print("3. Instalar dependencias")
     
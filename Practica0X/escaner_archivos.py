@@ -0,0 +1,190 @@
+"""
+Escáner de Directorios para el Analizador Multi-Documento
+========================================================
+
+Recorre árboles de directorios con os.scandir y entrega las rutas encontradas
+como un generador, de modo que DocumentAnalyzer puede empezar a analizar
+antes de que termine el descubrimiento de archivos.
+
+- Respeta reglas de exclusión estilo .gitignore (archivos .gitignore y patrones extra)
+- Omite árboles de dependencias, entornos virtuales y control de versiones
+- Solo entrega extensiones soportadas por el analizador
+"""
+
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from multi_document_analyzer import extensiones_soportadas
+
+# Directorios que nunca contienen código propio del proyecto
+DIRECTORIOS_EXCLUIDOS = {
+    '.git', '.hg', '.svn', 'node_modules', 'bower_components', 'vendor',
+    'venv', '.venv', 'env', '__pycache__', '.tox', '.nox', '.mypy_cache',
+    '.pytest_cache', 'dist', 'build', '.idea', '.vscode', '.cache_analisis'
+}
+
+def patron_a_regex(patron: str) -> "re.Pattern":
+    """Traduce un patrón de .gitignore a una expresión regular con la semántica de git
+    
+    * y ? no cruzan '/', mientras que ** coincide con cualquier número de directorios
+    ("**/x", "x/**" y "a/**/b"). fnmatch no sirve: su * también coincide con '/'.
+    """
+    partes = []
+    i = 0
+    while i < len(patron):
+        caracter = patron[i]
+        if patron.startswith('**/', i) and (i == 0 or patron[i - 1] == '/'):
+            partes.append('(?:.*/)?')
+            i += 3
+        elif patron.startswith('**', i) and i + 2 == len(patron) and (i == 0 or patron[i - 1] == '/'):
+            partes.append('.*')
+            i += 2
+        elif caracter == '*':
+            partes.append('[^/]*')
+            i += 1
+        elif caracter == '?':
+            partes.append('[^/]')
+            i += 1
+        elif caracter == '[':
+            fin = patron.find(']', i + 2)
+            if fin == -1:
+                partes.append(re.escape(caracter))
+                i += 1
+                continue
+            clase = patron[i + 1:fin]
+            if clase.startswith('!'):
+                clase = '^' + clase[1:]
+            partes.append('[' + clase.replace('\\', '\\\\') + ']')
+            i = fin + 1
+        elif caracter == '\\' and i + 1 < len(patron):
+            partes.append(re.escape(patron[i + 1]))
+            i += 2
+        else:
+            partes.append(re.escape(caracter))
+            i += 1
+    return re.compile(''.join(partes))
+
+class ReglaExclusion:
+    """Una línea de un .gitignore, relativa al directorio donde se definió"""
+    
+    def __init__(self, patron: str, base: str):
+        self.negada = patron.startswith('!')
+        if self.negada:
+            patron = patron[1:]
+        
+        self.solo_directorios = patron.endswith('/')
+        patron = patron.rstrip('/')
+        
+        # Con una barra (que no sea la final) el patrón se ancla al directorio base;
+        # sin ella coincide con el nombre en cualquier nivel
+        self.anclada = '/' in patron
+        self.patron = patron.lstrip('/')
+        self.regex = patron_a_regex(self.patron)
+        self.base = base
+    
+    def coincide(self, ruta_relativa: str, nombre: str, es_directorio: bool) -> bool:
+        if self.solo_directorios and not es_directorio:
+            return False
+        
+        if self.anclada:
+            if self.base:
+                if not ruta_relativa.startswith(self.base + '/'):
+                    return False
+                ruta_relativa = ruta_relativa[len(self.base) + 1:]
+            return self.regex.fullmatch(ruta_relativa) is not None
+        
+        return self.regex.fullmatch(nombre) is not None
+
+def leer_gitignore(ruta_gitignore: str, base: str) -> List[ReglaExclusion]:
+    """Lee las reglas de un archivo .gitignore (ignorando comentarios y líneas vacías)"""
+    reglas = []
+    try:
+        with open(ruta_gitignore, 'r', encoding='utf-8', errors='replace') as archivo:
+            for linea in archivo:
+                linea = linea.rstrip('\n').strip()
+                if linea and not linea.startswith('#'):
+                    reglas.append(ReglaExclusion(linea, base))
+    except OSError:
+        pass
+    return reglas
+
+def esta_excluido(reglas: List[ReglaExclusion], ruta_relativa: str, nombre: str, es_directorio: bool) -> bool:
+    """Aplica las reglas en orden: la última que coincide decide (igual que git)"""
+    excluido = False
+    for regla in reglas:
+        if regla.coincide(ruta_relativa, nombre, es_directorio):
+            excluido = not regla.negada
+    return excluido
+
+def _escanear_un_directorio(raiz: str, ruta: str, reglas: List[ReglaExclusion], extensiones: set,
+                            usar_gitignore: bool) -> Tuple[List[str], List[Tuple[str, List[ReglaExclusion]]]]:
+    """Lista un directorio: devuelve (archivos aceptados, subdirectorios a recorrer con sus reglas)"""
+    relativa_dir = os.path.relpath(ruta, raiz).replace(os.sep, '/')
+    relativa_dir = '' if relativa_dir == '.' else relativa_dir
+    
+    if usar_gitignore:
+        reglas = reglas + leer_gitignore(os.path.join(ruta, '.gitignore'), relativa_dir)
+    
+    archivos = []
+    subdirectorios = []
+    try:
+        with os.scandir(ruta) as entradas:
+            # Orden estable para que dos recorridos den la misma secuencia
+            for entrada in sorted(entradas, key=lambda e: e.name):
+                ruta_relativa = f"{relativa_dir}/{entrada.name}" if relativa_dir else entrada.name
+                
+                # DirEntry obtiene el tipo de la propia lectura del directorio (sin stat extra)
+                if entrada.is_dir(follow_symlinks=False):
+                    if entrada.name in DIRECTORIOS_EXCLUIDOS:
+                        continue
+                    if esta_excluido(reglas, ruta_relativa, entrada.name, True):
+                        continue
+                    subdirectorios.append((entrada.path, reglas))
+                
+                elif entrada.is_file():
+                    if os.path.splitext(entrada.name)[1].lower() not in extensiones:
+                        continue
+                    if esta_excluido(reglas, ruta_relativa, entrada.name, False):
+                        continue
+                    archivos.append(entrada.path)
+    except OSError as e:
+        print(f"⚠️  No se pudo leer el directorio {ruta}: {e}")
+    
+    return archivos, subdirectorios
+
+def escanear_directorio(raiz: str, extensiones: Optional[Iterable[str]] = None,
+                        excluir: Optional[Iterable[str]] = None, usar_gitignore: bool = True,
+                        workers: int = 1) -> Iterator[str]:
+    """
+    Genera las rutas de los archivos analizables bajo raiz
+    
+    excluir acepta patrones con sintaxis .gitignore que se suman a los de los archivos .gitignore.
+    workers > 1 lista varios directorios a la vez en hilos (útil en discos de red); en ese modo
+    el orden de las rutas depende de qué directorio termina antes.
+    """
+    # Por defecto, lo que haya registrado en el analizador al momento de escanear
+    extensiones = {e.lower() for e in (extensiones or extensiones_soportadas())}
+    reglas_base = [ReglaExclusion(patron, '') for patron in (excluir or [])]
+    
+    if workers <= 1:
+        # Recorrido en profundidad con pila explícita (sin límite de recursión)
+        pendientes = [(raiz, reglas_base)]
+        while pendientes:
+            ruta, reglas = pendientes.pop()
+            archivos, subdirectorios = _escanear_un_directorio(raiz, ruta, reglas, extensiones, usar_gitignore)
+            yield from archivos
+            pendientes.extend(reversed(subdirectorios))
+        return
+    
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        en_curso = {executor.submit(_escanear_un_directorio, raiz, raiz, reglas_base, extensiones, usar_gitignore)}
+        while en_curso:
+            terminados, en_curso = wait(en_curso, return_when=FIRST_COMPLETED)
+            for futuro in terminados:
+                archivos, subdirectorios = futuro.result()
+                for ruta, reglas in subdirectorios:
+                    en_curso.add(executor.submit(_escanear_un_directorio, raiz, ruta, reglas,
+                                                 extensiones, usar_gitignore))
+                yield from archivos
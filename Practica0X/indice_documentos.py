@@ -0,0 +1,200 @@
+"""
+Índice de Texto Completo del Analizador Multi-Documento
+======================================================
+
+Guarda el texto extraído de los PDF (por página) y de los DOCX (por párrafo) en un índice
+invertido SQLite FTS5 en disco, para buscar en los manuales después del análisis.
+
+- Cada coincidencia indica archivo, página o párrafo, un fragmento resaltado y su puntuación (BM25)
+- El índice se actualiza por archivo: solo se reindexa lo que cambió de tamaño o de fecha
+- FTS5 usa una tabla de contenido externa: el texto se guarda una sola vez
+
+Uso:
+    python indice_documentos.py indice_documentos.db "instalación airflow"
+"""
+
+import argparse
+import os
+import re
+import sqlite3
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+RUTA_INDICE = "indice_documentos.db"
+# Documentos indexados entre cada commit: agrupar escrituras evita un fsync por archivo
+LOTE_CONFIRMACION = 100
+RESULTADOS_POR_DEFECTO = 20
+# remove_diacritics: "instalacion" encuentra "instalación"
+TOKENIZADOR = "unicode61 remove_diacritics 2"
+
+_ESQUEMA = f"""
+CREATE TABLE IF NOT EXISTS documentos (
+    id INTEGER PRIMARY KEY,
+    archivo TEXT UNIQUE NOT NULL,
+    categoria TEXT NOT NULL,
+    tamano INTEGER NOT NULL,
+    mtime REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS fragmentos (
+    id INTEGER PRIMARY KEY,
+    documento INTEGER NOT NULL REFERENCES documentos(id),
+    tipo TEXT NOT NULL,
+    numero INTEGER NOT NULL,
+    texto TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS fragmentos_documento ON fragmentos(documento);
+CREATE VIRTUAL TABLE IF NOT EXISTS fragmentos_fts USING fts5(
+    texto, content='fragmentos', content_rowid='id', tokenize='{TOKENIZADOR}'
+);
+"""
+
+def _fragmentos_resultado(categoria: str, resultado: Dict[str, Any]) -> Iterator[Tuple[str, int, str]]:
+    """(tipo, número, texto) de cada página de un PDF o párrafo de un documento"""
+    if categoria == "pdf_content":
+        for pagina in resultado.get("texto_por_pagina", []):
+            yield "pagina", pagina["pagina"], pagina["texto"]
+    elif categoria == "doc_content":
+        for parrafo in resultado.get("parrafos_texto", []):
+            yield "parrafo", parrafo["numero"], parrafo["texto"]
+
+def consulta_fts(texto: str) -> str:
+    """Convierte texto libre en una consulta FTS5: todas las palabras obligatorias, "palabra*" como prefijo
+    
+    Cada término va entre comillas, así los signos de la entrada no se interpretan como operadores.
+    """
+    return " ".join(f'"{palabra}"{asterisco}' for palabra, asterisco in re.findall(r"(\w+)(\*?)", texto))
+
+class IndiceDocumentos:
+    """Índice invertido de páginas y párrafos (no es seguro entre hilos: usar desde el proceso principal)"""
+    
+    def __init__(self, ruta: str = RUTA_INDICE):
+        self.ruta = ruta
+        self.conexion = sqlite3.connect(ruta)
+        # WAL permite buscar desde otro proceso mientras se indexa
+        self.conexion.execute("PRAGMA journal_mode=WAL")
+        self.conexion.execute("PRAGMA synchronous=NORMAL")
+        self.conexion.executescript(_ESQUEMA)
+        self._sin_confirmar = 0
+    
+    def _borrar_fragmentos(self, documento: int):
+        # Con contenido externo, FTS5 necesita el texto anterior para retirar sus términos
+        self.conexion.execute(
+            "INSERT INTO fragmentos_fts(fragmentos_fts, rowid, texto) "
+            "SELECT 'delete', id, texto FROM fragmentos WHERE documento = ?", (documento,))
+        self.conexion.execute("DELETE FROM fragmentos WHERE documento = ?", (documento,))
+    
+    def _registrar_cambio(self):
+        self._sin_confirmar += 1
+        if self._sin_confirmar >= LOTE_CONFIRMACION:
+            self.confirmar()
+    
+    def indexar(self, archivo: str, categoria: str, resultado: Optional[Dict[str, Any]]) -> bool:
+        """Indexa (o reindexa) las páginas o párrafos de un análisis; False si no hubo cambios
+        
+        Los análisis con error y las categorías sin texto retiran el archivo del índice.
+        """
+        if resultado is None or "error" in resultado or categoria not in ("pdf_content", "doc_content"):
+            self.eliminar(archivo)
+            return False
+        
+        info = os.stat(archivo)
+        fila = self.conexion.execute("SELECT id, tamano, mtime FROM documentos WHERE archivo = ?",
+                                     (archivo,)).fetchone()
+        if fila is not None and fila[1] == info.st_size and fila[2] == info.st_mtime:
+            return False
+        
+        if fila is None:
+            documento = self.conexion.execute(
+                "INSERT INTO documentos(archivo, categoria, tamano, mtime) VALUES (?, ?, ?, ?)",
+                (archivo, categoria, info.st_size, info.st_mtime)).lastrowid
+        else:
+            documento = fila[0]
+            self._borrar_fragmentos(documento)
+            self.conexion.execute("UPDATE documentos SET categoria = ?, tamano = ?, mtime = ? WHERE id = ?",
+                                  (categoria, info.st_size, info.st_mtime, documento))
+        
+        self.conexion.executemany(
+            "INSERT INTO fragmentos(documento, tipo, numero, texto) VALUES (?, ?, ?, ?)",
+            ((documento, tipo, numero, texto) for tipo, numero, texto in _fragmentos_resultado(categoria, resultado)))
+        self.conexion.execute(
+            "INSERT INTO fragmentos_fts(rowid, texto) SELECT id, texto FROM fragmentos WHERE documento = ?",
+            (documento,))
+        self._registrar_cambio()
+        return True
+    
+    def eliminar(self, archivo: str) -> bool:
+        """Retira un archivo del índice (p. ej. porque se eliminó del disco)"""
+        fila = self.conexion.execute("SELECT id FROM documentos WHERE archivo = ?", (archivo,)).fetchone()
+        if fila is None:
+            return False
+        self._borrar_fragmentos(fila[0])
+        self.conexion.execute("DELETE FROM documentos WHERE id = ?", (fila[0],))
+        self._registrar_cambio()
+        return True
+    
+    def confirmar(self):
+        """Hace visibles en disco los cambios pendientes"""
+        self.conexion.commit()
+        self._sin_confirmar = 0
+    
+    def buscar(self, consulta: str, limite: int = RESULTADOS_POR_DEFECTO,
+               sintaxis_fts: bool = False) -> List[Dict[str, Any]]:
+        """Páginas y párrafos que contienen todas las palabras de la consulta, los más relevantes primero
+        
+        sintaxis_fts=True pasa la consulta sin cambios a FTS5 (OR, NOT, NEAR, "frases exactas"...).
+        """
+        expresion = consulta if sintaxis_fts else consulta_fts(consulta)
+        if not expresion.strip():
+            return []
+        
+        try:
+            filas = self.conexion.execute(
+                "SELECT d.archivo, f.tipo, f.numero, "
+                "snippet(fragmentos_fts, 0, '[', ']', '…', 12), bm25(fragmentos_fts) "
+                "FROM fragmentos_fts "
+                "JOIN fragmentos f ON f.id = fragmentos_fts.rowid "
+                "JOIN documentos d ON d.id = f.documento "
+                "WHERE fragmentos_fts MATCH ? ORDER BY rank LIMIT ?", (expresion, limite)).fetchall()
+        except sqlite3.OperationalError as e:
+            raise ValueError(f"Consulta no válida: {consulta} ({e})")
+        
+        return [{"archivo": archivo, "tipo": tipo, "numero": numero, "fragmento": fragmento,
+                 "puntuacion": round(-puntuacion, 4)}
+                for archivo, tipo, numero, fragmento, puntuacion in filas]
+    
+    def estadisticas(self) -> Dict[str, int]:
+        documentos = self.conexion.execute("SELECT COUNT(*) FROM documentos").fetchone()[0]
+        fragmentos = self.conexion.execute("SELECT COUNT(*) FROM fragmentos").fetchone()[0]
+        return {"documentos": documentos, "fragmentos": fragmentos}
+    
+    def cerrar(self):
+        self.confirmar()
+        self.conexion.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Búsqueda en el índice de documentos analizados")
+    parser.add_argument("indice", help="Ruta del índice (p. ej. indice_documentos.db)")
+    parser.add_argument("consulta", help="Palabras a buscar; 'palabra*' busca por prefijo")
+    parser.add_argument("-n", "--limite", type=int, default=RESULTADOS_POR_DEFECTO, help="Máximo de resultados")
+    parser.add_argument("--fts", action="store_true", help="Usar la sintaxis de consultas de FTS5")
+    args = parser.parse_args()
+    
+    if not os.path.exists(args.indice):
+        print(f"❌ No existe el índice: {args.indice}")
+        return
+    
+    indice = IndiceDocumentos(args.indice)
+    try:
+        resultados = indice.buscar(args.consulta, args.limite, args.fts)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return
+    finally:
+        indice.cerrar()
+    
+    print(f"🔎 {len(resultados)} resultados para: {args.consulta}")
+    for resultado in resultados:
+        ubicacion = "pág." if resultado["tipo"] == "pagina" else "párr."
+        print(f"  - {resultado['archivo']} ({ubicacion} {resultado['numero']}): {resultado['fragmento']}")
+
+if __name__ == "__main__":
+    main()
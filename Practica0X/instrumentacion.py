@@ -0,0 +1,300 @@
+"""
+Instrumentación del Analizador Multi-Documento
+=============================================
+
+Mide, por archivo y por etapa, el tiempo de pared, el tiempo de CPU, los bytes leídos
+y la memoria. Las etapas son apertura, extracción de texto y de tablas, parseo AST,
+escaneo de tokens o regex, indexación de texto completo y render del README.
+
+Los datos se entregan como un diccionario (resumen) y, opcionalmente, en un sink:
+- jsonl: una línea por archivo en cuanto termina, más una línea final de resumen
+- prometheus: formato de texto de Prometheus (apto para el textfile collector de node_exporter)
+"""
+
+import os
+import sys
+import json
+import time
+import heapq
+import tempfile
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, TextIO
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+ETAPAS = ("apertura", "extraccion_texto", "extraccion_tablas", "parse_ast",
+          "escaneo_tokens", "escaneo_regex", "indexacion", "render_readme")
+FORMATOS_SINK = ("jsonl", "prometheus")
+# Archivos más lentos que se listan en el resumen y se exportan a Prometheus
+ARCHIVOS_MAS_LENTOS = 10
+
+def rss_maximo_kb() -> Optional[int]:
+    """Máximo de memoria residente alcanzado por el proceso, en KB"""
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa en KB, macOS en bytes
+    return rss // 1024 if sys.platform == "darwin" else rss
+
+def _metricas_vacias() -> Dict[str, Any]:
+    return {"llamadas": 0, "wall_s": 0.0, "cpu_s": 0.0, "bytes_leidos": 0, "memoria_pico_bytes": 0}
+
+def _acumular(destino: Dict[str, Any], origen: Dict[str, Any]):
+    destino["llamadas"] += origen["llamadas"]
+    destino["wall_s"] += origen["wall_s"]
+    destino["cpu_s"] += origen["cpu_s"]
+    destino["bytes_leidos"] += origen["bytes_leidos"]
+    destino["memoria_pico_bytes"] = max(destino["memoria_pico_bytes"], origen["memoria_pico_bytes"])
+
+def _total_etapa_vacio() -> Dict[str, Any]:
+    return {**_metricas_vacias(), "archivo_mas_lento": None, "wall_s_max": 0.0}
+
+def _rss_mayor(a: Optional[int], b: Optional[int]) -> Optional[int]:
+    return max((rss for rss in (a, b) if rss is not None), default=None)
+
+class Instrumentacion:
+    """
+    Acumula métricas por archivo y por etapa (no es segura entre hilos: una instancia por hilo).
+    
+    La memoria por etapa es el pico de memoria Python asignada durante la etapa (tracemalloc);
+    solo se mide con medir_memoria=True porque tracemalloc ralentiza el análisis. Siempre se
+    informa además el máximo de memoria residente del proceso (incluye asignaciones nativas).
+    
+    Fuera del hilo principal (p. ej. en el pool de hilos) el tiempo de CPU es el del hilo y no se
+    mide la memoria por etapa: tracemalloc es global al proceso y reset_peak() de un hilo
+    borraría los picos que miden los demás.
+    
+    Con conservar_archivos=False cada archivo terminado se suma a los totales y a los más lentos
+    y luego se descarta: la memoria no crece con el corpus (el detalle queda en el sink jsonl).
+    """
+    
+    def __init__(self, medir_memoria: bool = False, ruta_sink: Optional[str] = None,
+                 formato_sink: str = "jsonl", por_hilo: Optional[bool] = None,
+                 conservar_archivos: bool = True):
+        if formato_sink not in FORMATOS_SINK:
+            raise ValueError(f"Formato de métricas no soportado: {formato_sink} (usar {', '.join(FORMATOS_SINK)})")
+        
+        if por_hilo is None:
+            por_hilo = threading.current_thread() is not threading.main_thread()
+        self.por_hilo = por_hilo
+        # process_time sumaría la CPU de todos los hilos que trabajan a la vez
+        self._reloj_cpu = time.thread_time if por_hilo else time.process_time
+        self.medir_memoria = medir_memoria and not por_hilo
+        self.ruta_sink = ruta_sink
+        self.formato_sink = formato_sink
+        self._sink: Optional[TextIO] = None
+        self.conservar_archivos = conservar_archivos
+        
+        # archivo -> {"wall_s", "cpu_s", "rss_max_kb", "etapas": {etapa: métricas}}; solo los
+        # archivos en curso si no se conservan
+        self.por_archivo: Dict[str, Dict[str, Any]] = {}
+        # Totales de los archivos terminados: etapa -> métricas, cantidad y montículo de los más lentos
+        self._totales_etapas: Dict[str, Dict[str, Any]] = {}
+        self._archivos_terminados = 0
+        self._mas_lentos: List[tuple] = []
+        # Etapas que no pertenecen a un archivo (p. ej. render_readme)
+        self.globales: Dict[str, Dict[str, Any]] = {}
+        # Pico de memoria acumulado por nivel de anidamiento (reset_peak borra el del nivel exterior)
+        self._picos: List[int] = []
+        
+        if self.medir_memoria and not tracemalloc.is_tracing():
+            tracemalloc.start()
+    
+    def _destino(self, archivo: Optional[str]) -> Dict[str, Dict[str, Any]]:
+        if archivo is None:
+            return self.globales
+        datos = self.por_archivo.setdefault(archivo, {"wall_s": 0.0, "cpu_s": 0.0, "rss_max_kb": None, "etapas": {}})
+        return datos["etapas"]
+    
+    def _iniciar_pico(self) -> int:
+        actual, pico = tracemalloc.get_traced_memory()
+        if self._picos:
+            self._picos[-1] = max(self._picos[-1], pico)
+        self._picos.append(0)
+        tracemalloc.reset_peak()
+        return actual
+    
+    def _terminar_pico(self) -> int:
+        pico = max(self._picos.pop(), tracemalloc.get_traced_memory()[1])
+        if self._picos:
+            self._picos[-1] = max(self._picos[-1], pico)
+        return pico
+    
+    @contextmanager
+    def etapa(self, nombre: str, archivo: Optional[str] = None, bytes_leidos: int = 0) -> Iterator[Dict[str, int]]:
+        """Mide el bloque como la etapa nombre; las llamadas repetidas se acumulan
+        
+        El diccionario entregado permite sumar bytes leídos dentro del bloque: medicion["bytes_leidos"] += n
+        """
+        medicion = {"bytes_leidos": bytes_leidos}
+        memoria_inicio = self._iniciar_pico() if self.medir_memoria else 0
+        inicio_wall = time.perf_counter()
+        inicio_cpu = self._reloj_cpu()
+        try:
+            yield medicion
+        finally:
+            metricas = self._destino(archivo).setdefault(nombre, _metricas_vacias())
+            metricas["llamadas"] += 1
+            metricas["wall_s"] += time.perf_counter() - inicio_wall
+            metricas["cpu_s"] += self._reloj_cpu() - inicio_cpu
+            metricas["bytes_leidos"] += medicion["bytes_leidos"]
+            if self.medir_memoria:
+                pico = self._terminar_pico() - memoria_inicio
+                metricas["memoria_pico_bytes"] = max(metricas["memoria_pico_bytes"], pico)
+    
+    @contextmanager
+    def archivo(self, archivo: str) -> Iterator[None]:
+        """Mide el análisis completo de un archivo (incluye consulta de caché y despacho)"""
+        inicio_wall = time.perf_counter()
+        inicio_cpu = self._reloj_cpu()
+        try:
+            yield
+        finally:
+            self._destino(archivo)
+            datos = self.por_archivo[archivo]
+            datos["wall_s"] += time.perf_counter() - inicio_wall
+            datos["cpu_s"] += self._reloj_cpu() - inicio_cpu
+            # Un archivo dividido en rangos ya trae el máximo de los procesos que lo extrajeron
+            datos["rss_max_kb"] = _rss_mayor(datos["rss_max_kb"], rss_maximo_kb())
+    
+    def metricas_archivo(self, archivo: str) -> Optional[Dict[str, Any]]:
+        """Métricas de un archivo, para enviarlas desde un proceso del pool"""
+        return self.por_archivo.get(archivo)
+    
+    def registrar_archivo(self, archivo: str, metricas: Optional[Dict[str, Any]]):
+        """Incorpora las métricas medidas en otro proceso"""
+        if metricas is not None:
+            self.por_archivo[archivo] = metricas
+    
+    def combinar_archivo(self, archivo: str, metricas: Optional[Dict[str, Any]]):
+        """Suma las métricas de una parte del archivo medida en otro proceso (p. ej. un rango de páginas)
+        
+        El wall_s resultante es el trabajo total de las partes, no el tiempo transcurrido.
+        """
+        if metricas is None:
+            return
+        if archivo not in self.por_archivo:
+            self.por_archivo[archivo] = metricas
+            return
+        datos = self.por_archivo[archivo]
+        datos["wall_s"] += metricas["wall_s"]
+        datos["cpu_s"] += metricas["cpu_s"]
+        datos["rss_max_kb"] = _rss_mayor(datos["rss_max_kb"], metricas["rss_max_kb"])
+        for nombre, metricas_etapa in metricas["etapas"].items():
+            _acumular(datos["etapas"].setdefault(nombre, _metricas_vacias()), metricas_etapa)
+    
+    def _escribir_sink(self, registro: Dict[str, Any]):
+        if self._sink is None:
+            self._sink = open(self.ruta_sink, 'w', encoding='utf-8')
+        self._sink.write(json.dumps(registro, ensure_ascii=False) + "\n")
+        self._sink.flush()
+    
+    def archivo_terminado(self, archivo: str):
+        """Suma el archivo a los totales; con sink jsonl vuelca de inmediato sus métricas
+        
+        Sin conservar_archivos, después se descarta su detalle.
+        """
+        datos = self.por_archivo.get(archivo)
+        if datos is None:
+            return
+        if self.ruta_sink and self.formato_sink == "jsonl":
+            self._escribir_sink({"registro": "archivo", "archivo": archivo, **datos})
+        
+        for nombre, metricas in datos["etapas"].items():
+            total = self._totales_etapas.setdefault(nombre, _total_etapa_vacio())
+            _acumular(total, metricas)
+            if metricas["wall_s"] > total["wall_s_max"]:
+                total["wall_s_max"] = metricas["wall_s"]
+                total["archivo_mas_lento"] = archivo
+        self._archivos_terminados += 1
+        lento = (datos["wall_s"], archivo, datos["cpu_s"])
+        if len(self._mas_lentos) < ARCHIVOS_MAS_LENTOS:
+            heapq.heappush(self._mas_lentos, lento)
+        else:
+            heapq.heappushpop(self._mas_lentos, lento)
+        
+        if not self.conservar_archivos:
+            del self.por_archivo[archivo]
+    
+    def resumen(self) -> Dict[str, Any]:
+        """Diccionario estructurado de métricas: totales por etapa, detalle por archivo y los más lentos
+        
+        Cuenta los archivos terminados (archivo_terminado); por_archivo queda vacío sin conservar_archivos.
+        """
+        por_etapa = {nombre: dict(total) for nombre, total in self._totales_etapas.items()}
+        for nombre, metricas in self.globales.items():
+            _acumular(por_etapa.setdefault(nombre, _total_etapa_vacio()), metricas)
+        
+        return {
+            "por_etapa": por_etapa,
+            "por_archivo": self.por_archivo,
+            "archivos": self._archivos_terminados,
+            "archivos_mas_lentos": [{"archivo": archivo, "wall_s": wall_s, "cpu_s": cpu_s}
+                                    for wall_s, archivo, cpu_s in sorted(self._mas_lentos, reverse=True)],
+            "memoria_medida": self.medir_memoria,
+            "rss_max_kb": rss_maximo_kb()
+        }
+    
+    def finalizar(self) -> Dict[str, Any]:
+        """Cierra el sink (resumen jsonl o exposición Prometheus) y devuelve el resumen"""
+        resumen = self.resumen()
+        if self.ruta_sink:
+            if self.formato_sink == "jsonl":
+                self._escribir_sink({"registro": "resumen", **{k: v for k, v in resumen.items() if k != "por_archivo"}})
+                self._sink.close()
+                self._sink = None
+            else:
+                escribir_prometheus(resumen, self.ruta_sink)
+        return resumen
+
+def _etiqueta(valor: str) -> str:
+    """Escapa un valor de etiqueta según el formato de texto de Prometheus"""
+    return valor.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def formato_prometheus(resumen: Dict[str, Any]) -> str:
+    """Convierte el resumen a formato de texto de Prometheus"""
+    lineas = []
+    
+    def metrica(nombre: str, tipo: str, ayuda: str, muestras: List[tuple]):
+        lineas.append(f"# HELP {nombre} {ayuda}")
+        lineas.append(f"# TYPE {nombre} {tipo}")
+        for etiquetas, valor in muestras:
+            lineas.append(f"{nombre}{{{etiquetas}}} {valor}" if etiquetas else f"{nombre} {valor}")
+    
+    etapas = sorted(resumen["por_etapa"].items())
+    metrica("analizador_etapa_llamadas_total", "counter", "Veces que se ejecutó cada etapa",
+            [(f'etapa="{nombre}"', m["llamadas"]) for nombre, m in etapas])
+    metrica("analizador_etapa_segundos_total", "counter", "Tiempo de pared acumulado por etapa",
+            [(f'etapa="{nombre}"', round(m["wall_s"], 6)) for nombre, m in etapas])
+    metrica("analizador_etapa_cpu_segundos_total", "counter", "Tiempo de CPU acumulado por etapa",
+            [(f'etapa="{nombre}"', round(m["cpu_s"], 6)) for nombre, m in etapas])
+    metrica("analizador_etapa_bytes_leidos_total", "counter", "Bytes leídos por etapa",
+            [(f'etapa="{nombre}"', m["bytes_leidos"]) for nombre, m in etapas])
+    if resumen["memoria_medida"]:
+        metrica("analizador_etapa_memoria_pico_bytes", "gauge", "Pico de memoria Python asignada en la etapa",
+                [(f'etapa="{nombre}"', m["memoria_pico_bytes"]) for nombre, m in etapas])
+    metrica("analizador_archivos_total", "gauge", "Archivos analizados", [("", resumen["archivos"])])
+    metrica("analizador_archivo_segundos", "gauge", "Tiempo de pared de los archivos más lentos",
+            [(f'archivo="{_etiqueta(a["archivo"])}"', round(a["wall_s"], 6)) for a in resumen["archivos_mas_lentos"]])
+    if resumen["rss_max_kb"] is not None:
+        metrica("analizador_rss_maximo_bytes", "gauge", "Máximo de memoria residente del proceso",
+                [("", resumen["rss_max_kb"] * 1024)])
+    return "\n".join(lineas) + "\n"
+
+def escribir_prometheus(resumen: Dict[str, Any], ruta: str):
+    """Escribe la exposición de forma atómica, para que un recolector nunca lea un archivo a medias"""
+    directorio = os.path.dirname(os.path.abspath(ruta))
+    fd, ruta_temporal = tempfile.mkstemp(dir=directorio, suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(formato_prometheus(resumen))
+        os.replace(ruta_temporal, ruta)
+    except OSError:
+        if os.path.exists(ruta_temporal):
+            os.remove(ruta_temporal)
+        raise
@@ -12,88 +12,701 @@ Genera un resumen comprehensivo y documentación profesional en formato Markdown
 
 import os
 import ast
+import importlib
 import re
 import json
+import io
+import mmap
+import time
+import hashlib
+import tempfile
+import tokenize
+import functools
+from collections import deque
+import concurrent.futures  # ProcessPoolExecutor (y multiprocessing) se cargan al primer uso
+from contextlib import nullcontext
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Callable, Dict, List, Any, Iterable, Iterator, Optional, TextIO, Tuple
 from datetime import datetime
 
-# Importaciones para diferentes tipos de archivo
-try:
-    import fitz  # PyMuPDF
-    PDF_AVAILABLE = True
-except ImportError:
-    PDF_AVAILABLE = False
+from instrumentacion import Instrumentacion
 
-try:
-    from docx import Document
-    DOCX_AVAILABLE = True
-except ImportError:
-    DOCX_AVAILABLE = False
+# Dependencias opcionales por tipo de archivo. Se importan la primera vez que se usan:
+# un análisis solo de código no paga el coste de cargar PyMuPDF ni python-docx.
+_BACKENDS = {
+    "pdf": ("fitz", "PyMuPDF"),
+    "docx": ("docx", "python-docx"),
+}
+_backends_cargados: Dict[str, Any] = {}
+
+def cargar_backend(nombre: str) -> Optional[Any]:
+    """Importa el módulo del backend la primera vez y lo devuelve; None si no está instalado"""
+    if nombre not in _backends_cargados:
+        modulo, _ = _BACKENDS[nombre]
+        try:
+            _backends_cargados[nombre] = importlib.import_module(modulo)
+        except ImportError:
+            _backends_cargados[nombre] = None
+    return _backends_cargados[nombre]
+
+def _error_backend(nombre: str) -> Dict[str, str]:
+    paquete = _BACKENDS[nombre][1]
+    return {"error": f"{paquete} no está instalado. Instalar con: pip install {paquete}"}
+
+# PDF_AVAILABLE / DOCX_AVAILABLE se siguen pudiendo importar; consultarlos carga el backend
+_BANDERAS_BACKEND = {"PDF_AVAILABLE": "pdf", "DOCX_AVAILABLE": "docx"}
+
+def __getattr__(nombre: str):
+    if nombre in _BANDERAS_BACKEND:
+        return cargar_backend(_BANDERAS_BACKEND[nombre]) is not None
+    raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
+
+# Mapeo de extensiones a lenguajes (Python se analiza con AST, el resto con regex)
+LENGUAJES_CODIGO = {
+    '.js': 'JavaScript',
+    '.ts': 'TypeScript',
+    '.java': 'Java',
+    '.cpp': 'C++',
+    '.c': 'C',
+    '.cs': 'C#',
+    '.php': 'PHP',
+    '.rb': 'Ruby',
+    '.go': 'Go'
+}
+
+# Tipo de carga de un manejador: "cpu" se ejecuta en el pool de procesos, "io" en el de hilos
+CARGAS = ("cpu", "io")
+
+class ManejadorArchivo:
+    """Tipo de archivo soportado: sus extensiones, la categoría del resultado, quién lo analiza y su tipo de carga
+
+    metodo es el nombre de un método de DocumentAnalyzer o una función f(analyzer, ruta) -> dict.
+    estimar_costo(ruta) devuelve el costo estimado en segundos, usado por el planificador;
+    por defecto es proporcional al tamaño del archivo.
+    """
+    
+    def __init__(self, nombre: str, extensiones: Iterable[str], categoria: str, metodo, carga: str = "cpu",
+                 estimar_costo: Optional[Callable[[str], float]] = None):
+        if carga not in CARGAS:
+            raise ValueError(f"Tipo de carga no soportado: {carga} (usar {', '.join(CARGAS)})")
+        self.nombre = nombre
+        self.extensiones = [extension.lower() for extension in extensiones]
+        self.categoria = categoria
+        self.metodo = metodo
+        self.carga = carga
+        self.estimar_costo = estimar_costo or _estimador_por_tamano(SEGUNDOS_POR_MB_DEFECTO)
+    
+    def analizar(self, analyzer: "DocumentAnalyzer", ruta_archivo: str) -> Dict[str, Any]:
+        if callable(self.metodo):
+            return self.metodo(analyzer, ruta_archivo)
+        return getattr(analyzer, self.metodo)(ruta_archivo)
+
+# Costos aproximados (segundos) medidos con benchmark_analizador.py; solo importa su proporción
+SEGUNDOS_POR_PAGINA_PDF = 0.002
+SEGUNDOS_POR_MB_DOCX = 0.6
+SEGUNDOS_POR_MB_PYTHON = 2.5
+SEGUNDOS_POR_MB_DEFECTO = 0.2
+# El planificador divide los PDF de más páginas que el umbral en fragmentos de PAGINAS_POR_FRAGMENTO
+UMBRAL_PAGINAS_DIVIDIR = 200
+PAGINAS_POR_FRAGMENTO = 100
+INTERVALO_PROGRESO = 1.0  # Segundos entre líneas de progreso
+
+def _estimador_por_tamano(segundos_por_mb: float) -> Callable[[str], float]:
+    def estimar(ruta_archivo: str) -> float:
+        return os.path.getsize(ruta_archivo) / (1024 * 1024) * segundos_por_mb
+    return estimar
+
+def contar_paginas_pdf(ruta_pdf: str) -> Optional[int]:
+    """Número de páginas según la tabla del PDF (no extrae contenido); None si no se puede abrir"""
+    fitz = cargar_backend("pdf")
+    if fitz is None:
+        return None
+    try:
+        with fitz.open(ruta_pdf) as doc:
+            return len(doc)
+    except Exception:
+        return None
+
+def _costo_paginas_pdf(ruta_pdf: str, paginas: Optional[int]) -> float:
+    if paginas is None:
+        return _estimador_por_tamano(SEGUNDOS_POR_MB_DEFECTO)(ruta_pdf)
+    return paginas * SEGUNDOS_POR_PAGINA_PDF
+
+def _estimar_costo_pdf(ruta_pdf: str) -> float:
+    return _costo_paginas_pdf(ruta_pdf, contar_paginas_pdf(ruta_pdf))
+
+# Registro de manejadores por extensión. Los que se registren fuera de este módulo deben
+# hacerlo al importarse, para que también existan en los procesos del pool.
+MANEJADORES: Dict[str, ManejadorArchivo] = {}
+
+def registrar_manejador(manejador: ManejadorArchivo) -> ManejadorArchivo:
+    """Añade (o reemplaza) el manejador para cada una de sus extensiones"""
+    for extension in manejador.extensiones:
+        MANEJADORES[extension] = manejador
+    return manejador
+
+def manejador_para(ruta_archivo: str) -> Optional[ManejadorArchivo]:
+    return MANEJADORES.get(Path(ruta_archivo).suffix.lower())
+
+def extensiones_soportadas(categoria: Optional[str] = None) -> List[str]:
+    """Extensiones registradas (opcionalmente solo las de una categoría de resultado), en orden de registro"""
+    return [extension for extension, manejador in MANEJADORES.items()
+            if categoria is None or manejador.categoria == categoria]
+
+def manejadores_registrados() -> List[ManejadorArchivo]:
+    """Manejadores distintos, en orden de registro"""
+    return list({id(manejador): manejador for manejador in MANEJADORES.values()}.values())
+
+# PDF, DOCX y AST de Python son CPU; el resto de lenguajes es una lectura y un único escaneo regex
+_MANEJADOR_PDF = registrar_manejador(ManejadorArchivo("PDF", ['.pdf'], "pdf_content", "extraer_texto_pdf", "cpu",
+                                                     _estimar_costo_pdf))
+registrar_manejador(ManejadorArchivo("Documentos", ['.docx', '.doc'], "doc_content", "extraer_texto_docx", "cpu",
+                                     _estimador_por_tamano(SEGUNDOS_POR_MB_DOCX)))
+registrar_manejador(ManejadorArchivo("Python", ['.py'], "code_analysis", "analizar_codigo_python", "cpu",
+                                     _estimador_por_tamano(SEGUNDOS_POR_MB_PYTHON)))
+registrar_manejador(ManejadorArchivo("Código", list(LENGUAJES_CODIGO), "code_analysis", "analizar_codigo_generico", "io"))
+
+# Fragmentos de regex: nombre del grupo -> (categoría, patrón). Categoría None = se consume y se ignora.
+# Si el patrón define el subgrupo "<nombre>_v", ese es el valor registrado; si no, la coincidencia completa.
+_FRAGMENTOS_CODIGO = {
+    'cadena_doble': (None, r'"(?:\\.|[^"\\\n])*"'),
+    'cadena_simple': (None, r"'(?:\\.|[^'\\\n])*'"),
+    'cadena_invertida': (None, r'`(?:\\.|[^`\\])*`'),
+    'comentario_bloque': ('comentarios', r'/\*(?s:.*?)\*/'),
+    'comentario_linea': ('comentarios', r'//[^\n]*'),
+    'include': ('imports', r'#include\s*[<"](?P<include_v>[^>"]+)[>"]'),
+    'comentario_hash': ('comentarios', r'#[^\n]*'),
+    'funcion_js': ('funciones', r'\bfunction\s+(?P<funcion_js_v>\w+)\s*\('),
+    'funcion_def': ('funciones', r'\bdef\s+(?P<funcion_def_v>[\w.?!]+)'),
+    'funcion_metodo': ('funciones', r'\b(?:public|private|protected|internal)\s+(?:(?:static|final|abstract|override|virtual|async)\s+)*[\w<>\[\],.?]+\s+(?P<funcion_metodo_v>\w+)\s*\('),
+    'funcion_go': ('funciones', r'\bfunc\s+(?:\([^)]*\)\s*)?(?P<funcion_go_v>\w+)\s*\('),
+    'clase': ('clases', r'\bclass\s+(?P<clase_v>\w+)'),
+    'interfaz': ('clases', r'\binterface\s+(?P<interfaz_v>\w+)'),
+    'tipo_go': ('clases', r'\btype\s+(?P<tipo_go_v>\w+)\s+(?:struct|interface)\b'),
+    'import': ('imports', r'\bimport\s+(?P<import_v>[^;\n]+)'),
+    'using': ('imports', r'\busing\s+(?P<using_v>[^;\n(]+);'),
+    'require': ('imports', r'\brequire(?:_once|_relative)?\s*\(?\s*[\'"](?P<require_v>[^\'"]+)[\'"]'),
+}
+
+# Fragmentos aplicables a cada lenguaje; el orden importa (las cadenas y comentarios van primero)
+_FRAGMENTOS_POR_LENGUAJE = {
+    'JavaScript': ['cadena_doble', 'cadena_simple', 'cadena_invertida', 'comentario_bloque', 'comentario_linea',
+                   'funcion_js', 'clase', 'import', 'require'],
+    'TypeScript': ['cadena_doble', 'cadena_simple', 'cadena_invertida', 'comentario_bloque', 'comentario_linea',
+                   'funcion_js', 'funcion_metodo', 'clase', 'interfaz', 'import', 'require'],
+    'Java': ['cadena_doble', 'cadena_simple', 'comentario_bloque', 'comentario_linea',
+             'funcion_metodo', 'clase', 'interfaz', 'import'],
+    'C++': ['cadena_doble', 'cadena_simple', 'comentario_bloque', 'comentario_linea',
+            'include', 'clase', 'using'],
+    'C': ['cadena_doble', 'cadena_simple', 'comentario_bloque', 'comentario_linea', 'include'],
+    'C#': ['cadena_doble', 'cadena_simple', 'comentario_bloque', 'comentario_linea',
+           'funcion_metodo', 'clase', 'interfaz', 'using'],
+    'PHP': ['cadena_doble', 'cadena_simple', 'comentario_bloque', 'comentario_linea', 'comentario_hash',
+            'funcion_js', 'funcion_metodo', 'clase', 'interfaz', 'require'],
+    'Ruby': ['cadena_doble', 'cadena_simple', 'comentario_hash', 'funcion_def', 'clase', 'require'],
+    'Go': ['cadena_doble', 'cadena_invertida', 'comentario_bloque', 'comentario_linea',
+           'funcion_go', 'tipo_go', 'import'],
+}
+_FRAGMENTOS_CON_VALOR = {nombre for nombre, (_, patron) in _FRAGMENTOS_CODIGO.items() if f"(?P<{nombre}_v>" in patron}
+
+# Extensión desconocida: se prueban todos los fragmentos
+_FRAGMENTOS_POR_LENGUAJE['Desconocido'] = list(_FRAGMENTOS_CODIGO)
+
+@functools.lru_cache(maxsize=None)
+def _regex_lenguaje(lenguaje: str) -> "re.Pattern":
+    """Una única alternancia compilada por lenguaje, construida la primera vez que se analiza ese lenguaje"""
+    fragmentos = _FRAGMENTOS_POR_LENGUAJE[lenguaje]
+    return re.compile('|'.join(f"(?P<{nombre}>{_FRAGMENTOS_CODIGO[nombre][1]})" for nombre in fragmentos),
+                      re.MULTILINE)
+
+ARCHIVO_ANALISIS = "analisis_completo.json"
+
+def _hash_archivo(ruta_archivo: str) -> str:
+    """SHA-256 del contenido del archivo, leído por bloques"""
+    sha = hashlib.sha256()
+    with open(ruta_archivo, 'rb') as archivo:
+        for bloque in iter(lambda: archivo.read(1024 * 1024), b''):
+            sha.update(bloque)
+    return sha.hexdigest()
+
+def _huella_archivo(ruta_archivo: str, con_hash: bool = False) -> Dict[str, Any]:
+    """Huella usada por el modo incremental para detectar cambios
+    
+    con_hash añade el SHA-256, que exige leer el archivo completo: se calcula junto al análisis
+    (en el proceso o hilo que lo analiza) y el modo incremental lo compara cuando cambió el mtime
+    pero no el tamaño.
+    """
+    info = os.stat(ruta_archivo)
+    huella = {
+        "tamano": info.st_size,
+        "mtime": info.st_mtime
+    }
+    if con_hash:
+        huella["sha256"] = _hash_archivo(ruta_archivo)
+    return huella
+
+# Lectura de código fuente: a partir de UMBRAL_MMAP bytes el archivo se mapea en memoria
+# en lugar de copiarse a un buffer, y solo se decodifica una vez.
+UMBRAL_MMAP = 1024 * 1024
+TAMANO_BLOQUE_DETECCION = 8192
+# Se prueban en orden sobre el mismo buffer; latin-1 acepta cualquier secuencia de bytes
+CODIFICACIONES_RESPALDO = ("utf-8", "cp1252", "latin-1")
+_BOMS = ((b"\xef\xbb\xbf", "utf-8-sig"), (b"\xff\xfe\x00\x00", "utf-32"), (b"\x00\x00\xfe\xff", "utf-32"),
+         (b"\xff\xfe", "utf-16"), (b"\xfe\xff", "utf-16"))
+
+def _detectar_codificacion(bloque: bytes) -> Optional[str]:
+    """Codificación declarada por BOM o por cookie PEP 263 (# -*- coding: ... -*-); None si no hay"""
+    for bom, codificacion in _BOMS:
+        if bloque.startswith(bom):
+            return codificacion
+    try:
+        codificacion, lineas = tokenize.detect_encoding(io.BytesIO(bloque).readline)
+    except SyntaxError:
+        return None
+    # Sin declaración detect_encoding devuelve "utf-8" por defecto: se distingue buscando la cookie
+    if any(b"coding" in linea for linea in lineas):
+        return codificacion
+    return None
+
+def _es_binario(bloque: bytes) -> bool:
+    """Heurística habitual (git, grep): un byte nulo en el primer bloque indica un archivo binario"""
+    return b"\0" in bloque
+
+def leer_texto(ruta_archivo: str) -> Optional[Tuple[str, str, int]]:
+    """Lee un archivo de texto y devuelve (texto, codificación, líneas); None si parece binario
+    
+    Las líneas se cuentan sobre los bytes y los saltos de línea se normalizan como en el modo
+    texto de open(). Si la decodificación falla se prueba la siguiente codificación sobre el
+    mismo buffer, sin volver a leer el archivo.
+    """
+    with open(ruta_archivo, 'rb') as archivo:
+        tamano = os.fstat(archivo.fileno()).st_size
+        if tamano >= UMBRAL_MMAP:
+            datos = mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            datos = archivo.read()
+    
+    try:
+        bloque = datos[:TAMANO_BLOQUE_DETECCION]
+        declarada = _detectar_codificacion(bloque)
+        # UTF-16/32 contienen bytes nulos: solo se descartan como binarios los archivos sin BOM
+        if declarada is None and _es_binario(bloque):
+            return None
+        
+        candidatas = (declarada,) + CODIFICACIONES_RESPALDO if declarada else CODIFICACIONES_RESPALDO
+        for codificacion in candidatas:
+            try:
+                texto = str(datos, codificacion)
+                break
+            except (UnicodeDecodeError, LookupError):
+                continue
+        
+        normalizado = "\r" in texto
+        if normalizado:
+            texto = texto.replace("\r\n", "\n").replace("\r", "\n")
+        # En UTF-8 y en codificaciones de un byte, b"\n" solo aparece como salto de línea
+        # (mmap.count existe desde Python 3.13; antes se cuenta sobre el texto ya decodificado)
+        if not normalizado and not codificacion.startswith(("utf-16", "utf-32")) and hasattr(datos, "count"):
+            lineas = datos.count(b"\n") + 1
+        else:
+            lineas = texto.count("\n") + 1
+        return texto, codificacion, lineas
+    finally:
+        if isinstance(datos, mmap.mmap):
+            datos.close()
+
+# Cambiar al modificar la salida de cualquier analizador: invalida la caché existente
+VERSION_ANALIZADOR = "1.3"
+
+class CacheResultados:
+    """Caché en disco de análisis, indexada por hash de contenido, tipo de archivo y versión del analizador"""
+    
+    def __init__(self, directorio: str = ".cache_analisis", tamano_maximo: int = 512 * 1024 * 1024):
+        self.directorio = directorio
+        self.tamano_maximo = tamano_maximo
+        Path(directorio).mkdir(parents=True, exist_ok=True)
+    
+    def clave(self, ruta_archivo: str, sha256: Optional[str] = None) -> str:
+        """Calcula la clave de caché a partir del contenido del archivo (sha256 evita volver a leerlo)"""
+        extension = Path(ruta_archivo).suffix.lower()
+        return f"{sha256 or _hash_archivo(ruta_archivo)}-{extension.lstrip('.')}-v{VERSION_ANALIZADOR}"
+    
+    def _ruta_entrada(self, clave: str) -> str:
+        return os.path.join(self.directorio, f"{clave}.json")
+    
+    def obtener(self, clave: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """Devuelve (categoria, resultado) si la clave está en caché"""
+        ruta = self._ruta_entrada(clave)
+        try:
+            with open(ruta, 'r', encoding='utf-8') as f:
+                entrada = json.load(f)
+        except (OSError, ValueError):
+            return None
+        
+        # Marcar la entrada como usada recientemente para la política LRU
+        try:
+            os.utime(ruta)
+        except OSError:
+            pass
+        return entrada["categoria"], entrada["resultado"]
+    
+    def guardar(self, clave: str, categoria: str, resultado: Dict[str, Any]):
+        """Guarda un resultado de forma atómica (seguro con varios procesos escribiendo a la vez)"""
+        fd, ruta_temporal = tempfile.mkstemp(dir=self.directorio, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({"categoria": categoria, "resultado": resultado}, f, ensure_ascii=False)
+            os.replace(ruta_temporal, self._ruta_entrada(clave))
+        except OSError:
+            if os.path.exists(ruta_temporal):
+                os.remove(ruta_temporal)
+    
+    def purgar(self) -> int:
+        """Elimina las entradas menos usadas hasta quedar bajo el tamaño máximo; devuelve cuántas borró"""
+        entradas = []
+        total = 0
+        with os.scandir(self.directorio) as it:
+            for entrada in it:
+                if entrada.is_file() and entrada.name.endswith(".json"):
+                    info = entrada.stat()
+                    entradas.append((info.st_mtime, info.st_size, entrada.path))
+                    total += info.st_size
+        
+        eliminadas = 0
+        for _, tamano, ruta in sorted(entradas):
+            if total <= self.tamano_maximo:
+                break
+            try:
+                os.remove(ruta)
+            except OSError:
+                continue
+            total -= tamano
+            eliminadas += 1
+        return eliminadas
+
+# Campos con el texto extraído: no se necesitan para el README y son lo que más memoria ocupa
+_CAMPOS_TEXTO = ("texto_completo", "texto_por_pagina", "parrafos_texto", "tablas_contenido")
+
+def _resultado_ligero(resultado: Dict[str, Any]) -> Dict[str, Any]:
+    """Copia del resultado sin los campos de texto completo"""
+    return {clave: valor for clave, valor in resultado.items() if clave not in _CAMPOS_TEXTO}
+
+class _VisitantePython(ast.NodeVisitor):
+    """Recolecta funciones, clases, métodos, decoradores e imports en un solo recorrido del AST"""
+    
+    def __init__(self):
+        self.funciones = []
+        self.clases = []
+        self.imports = []
+        # Pila de ámbitos abiertos: la info de la clase, o None para una función
+        self._ambitos = []
+    
+    def _visitar_funcion(self, nodo, es_async: bool):
+        # Es método solo si se define directamente en el cuerpo de una clase
+        clase_info = self._ambitos[-1] if self._ambitos else None
+        clase = clase_info["nombre"] if clase_info is not None else None
+        
+        self.funciones.append({
+            "nombre": nodo.name,
+            "linea": nodo.lineno,
+            "argumentos": [arg.arg for arg in nodo.args.args],
+            "docstring": ast.get_docstring(nodo),
+            "async": es_async,
+            "decoradores": [ast.unparse(d) for d in nodo.decorator_list],
+            "clase": clase
+        })
+        if clase_info is not None:
+            clase_info["metodos"].append(nodo.name)
+        
+        self._ambitos.append(None)
+        self.generic_visit(nodo)
+        self._ambitos.pop()
+    
+    def visit_FunctionDef(self, nodo):
+        self._visitar_funcion(nodo, es_async=False)
+    
+    def visit_AsyncFunctionDef(self, nodo):
+        self._visitar_funcion(nodo, es_async=True)
+    
+    def visit_ClassDef(self, nodo):
+        class_info = {
+            "nombre": nodo.name,
+            "linea": nodo.lineno,
+            "docstring": ast.get_docstring(nodo),
+            "decoradores": [ast.unparse(d) for d in nodo.decorator_list],
+            "metodos": []
+        }
+        self.clases.append(class_info)
+        
+        self._ambitos.append(class_info)
+        self.generic_visit(nodo)
+        self._ambitos.pop()
+    
+    def visit_Import(self, nodo):
+        for alias in nodo.names:
+            self.imports.append(alias.name)
+    
+    def visit_ImportFrom(self, nodo):
+        modulo = nodo.module or ""
+        for alias in nodo.names:
+            self.imports.append(f"{modulo}.{alias.name}")
+
+def rangos_paginas(total_paginas: int, workers: int) -> List[Tuple[int, int]]:
+    """Divide [0, total_paginas) en rangos contiguos; varios por proceso para equilibrar la carga"""
+    if total_paginas == 0:
+        return []
+    tamano = max(1, -(-total_paginas // (max(1, workers) * 4)))
+    return [(inicio, min(inicio + tamano, total_paginas)) for inicio in range(0, total_paginas, tamano)]
+
+def _extraer_rango_paginas(ruta_pdf: str, pagina_inicio: int, pagina_fin: int) -> List[Dict[str, Any]]:
+    """Extrae un rango de páginas dentro de un proceso del pool"""
+    return list(DocumentAnalyzer(instrumentar=False).iterar_paginas_pdf(ruta_pdf, pagina_inicio, pagina_fin))
+
+def _extraer_fragmento_pdf(ruta_pdf: str, pagina_inicio: int, pagina_fin: int,
+                           medir_memoria: Optional[bool] = None) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """Como _extraer_rango_paginas, devolviendo también las métricas del rango (None sin instrumentación)"""
+    analyzer = DocumentAnalyzer(instrumentar=medir_memoria is not None, medir_memoria=bool(medir_memoria))
+    with analyzer._medir_archivo(ruta_pdf):
+        registros = list(analyzer.iterar_paginas_pdf(ruta_pdf, pagina_inicio, pagina_fin))
+    metricas = analyzer.instrumentacion.metricas_archivo(ruta_pdf) if analyzer.instrumentacion else None
+    return registros, metricas
+
+def _analizar_archivo_en_proceso(archivo: str, directorio_cache: Optional[str] = None,
+                                 medir_memoria: Optional[bool] = None) -> Tuple[Optional[str], Optional[Dict[str, Any]], Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """Analiza un archivo dentro de un proceso o hilo de un pool (nivel de módulo para poder serializarse)
+    
+    Cada llamada usa su propio DocumentAnalyzer, así los hilos no comparten estado.
+
+    medir_memoria None desactiva la instrumentación; si no, se devuelven también las métricas del archivo.
+    El SHA-256 de la huella se calcula aquí, en paralelo, y no en el proceso principal.
+    """
+    analyzer = DocumentAnalyzer(directorio_cache=directorio_cache, instrumentar=medir_memoria is not None,
+                                medir_memoria=bool(medir_memoria))
+    with analyzer._medir_archivo(archivo):
+        categoria, resultado, huella = analyzer._analizar_con_huella(archivo)
+    metricas = analyzer.instrumentacion.metricas_archivo(archivo) if analyzer.instrumentacion else None
+    return categoria, resultado, huella, metricas
+
+class ProgresoAnalisis:
+    """Muestra el avance y el tiempo restante estimado según el costo ya completado"""
+    
+    def __init__(self, total_archivos: int, costo_total: float, intervalo: float = INTERVALO_PROGRESO):
+        self.total_archivos = total_archivos
+        self.costo_total = costo_total
+        self.intervalo = intervalo
+        self.archivos_listos = 0
+        self.costo_listo = 0.0
+        self.inicio = time.perf_counter()
+        self._ultima_linea = self.inicio
+    
+    def avanzar(self, costo: float, archivo_terminado: bool = True):
+        self.costo_listo += costo
+        if archivo_terminado:
+            self.archivos_listos += 1
+        ahora = time.perf_counter()
+        if ahora - self._ultima_linea >= self.intervalo or self.archivos_listos == self.total_archivos:
+            self._ultima_linea = ahora
+            self.mostrar(ahora)
+    
+    def fraccion(self) -> float:
+        if self.costo_total <= 0:
+            return self.archivos_listos / self.total_archivos if self.total_archivos else 1.0
+        return min(1.0, self.costo_listo / self.costo_total)
+    
+    def eta(self, ahora: float) -> Optional[float]:
+        """Segundos restantes suponiendo que el costo pendiente avanza al ritmo observado"""
+        fraccion = self.fraccion()
+        if fraccion <= 0:
+            return None
+        return (ahora - self.inicio) * (1 - fraccion) / fraccion
+    
+    def mostrar(self, ahora: float):
+        eta = self.eta(ahora)
+        texto_eta = f"{eta:.1f}s" if eta is not None else "?"
+        print(f"⏳ Progreso: {self.archivos_listos}/{self.total_archivos} archivos | "
+              f"{self.fraccion():.0%} del costo estimado | {ahora - self.inicio:.1f}s | ETA {texto_eta}")
 
 class DocumentAnalyzer:
     """Analizador principal para múltiples tipos de documentos"""
     
-    def __init__(self):
+    def __init__(self, workers: int = 1, directorio_cache: Optional[str] = None,
+                 tamano_maximo_cache: int = 512 * 1024 * 1024, workers_paginas: int = 1,
+                 instrumentar: bool = True, medir_memoria: bool = False,
+                 ruta_metricas: Optional[str] = None, formato_metricas: str = "jsonl",
+                 hilos: Optional[int] = None, ruta_indice: Optional[str] = None):
+        # workers > 1 activa el modo paralelo: procesos para manejadores "cpu" e hilos para los "io"
+        self.workers = max(1, workers)
+        self.hilos = max(1, hilos) if hilos else min(32, self.workers + 4)
+        # workers_paginas > 1 divide cada PDF en rangos de páginas procesados en paralelo
+        self.workers_paginas = max(1, workers_paginas)
+        # directorio_cache activa la caché en disco de resultados por contenido
+        self.cache = CacheResultados(directorio_cache, tamano_maximo_cache) if directorio_cache else None
+        # Métricas por archivo y etapa; ruta_metricas añade un sink jsonl o prometheus. Con sink
+        # solo se conservan los totales y los archivos más lentos (el detalle va al sink jsonl)
+        self.instrumentacion = (Instrumentacion(medir_memoria, ruta_metricas, formato_metricas,
+                                                conservar_archivos=ruta_metricas is None)
+                                if instrumentar else None)
+        # ruta_indice activa el índice de texto completo (SQLite FTS5) de páginas y párrafos
+        self.indice = None
+        if ruta_indice:
+            from indice_documentos import IndiceDocumentos  # sqlite3 solo se carga si se indexa
+            self.indice = IndiceDocumentos(ruta_indice)
         self.resultados = {
             "pdf_content": [],
             "doc_content": [],
             "code_analysis": {},
             "summary": {},
+            "indice_archivos": {},
             "timestamp": datetime.now().isoformat()
         }
     
-    def extraer_texto_pdf(self, ruta_pdf: str) -> Dict[str, Any]:
-        """Extrae texto e imágenes de archivos PDF"""
-        if not PDF_AVAILABLE:
-            return {"error": "PyMuPDF no está instalado. Instalar con: pip install PyMuPDF"}
+    def _etapa(self, nombre: str, archivo: Optional[str] = None, bytes_leidos: int = 0):
+        """Contexto que mide una etapa (o no hace nada si la instrumentación está desactivada)"""
+        if self.instrumentacion is None:
+            return nullcontext({"bytes_leidos": bytes_leidos})
+        return self.instrumentacion.etapa(nombre, archivo, bytes_leidos)
+    
+    def _medir_archivo(self, archivo: str):
+        if self.instrumentacion is None:
+            return nullcontext()
+        return self.instrumentacion.archivo(archivo)
+    
+    def iterar_paginas_pdf(self, ruta_pdf: str, pagina_inicio: int = 0,
+                           pagina_fin: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Genera un registro por página (texto e imágenes) sin acumular el documento en memoria
+        
+        pagina_inicio/pagina_fin (base 0, fin exclusivo) limitan el recorrido a un rango de páginas.
+        """
+        fitz = cargar_backend("pdf")
+        with self._etapa("apertura", ruta_pdf, os.path.getsize(ruta_pdf)):
+            doc = fitz.open(ruta_pdf)
+        try:
+            fin = len(doc) if pagina_fin is None else min(pagina_fin, len(doc))
+            for num_pagina in range(pagina_inicio, fin):
+                with self._etapa("extraccion_texto", ruta_pdf):
+                    pagina = doc[num_pagina]
+                    registro = {
+                        "pagina": num_pagina + 1,
+                        "texto": pagina.get_text(),
+                        # Contar imágenes (sin extraer por ahora)
+                        "cantidad_imagenes": len(pagina.get_images())
+                    }
+                yield registro
+        finally:
+            doc.close()
+    
+    def iterar_paginas_pdf_paralelo(self, ruta_pdf: str, workers: int) -> Iterator[Dict[str, Any]]:
+        """Como iterar_paginas_pdf, pero cada proceso abre el documento y extrae un rango de páginas
+        
+        Los rangos se devuelven en orden, así que el resultado es idéntico al recorrido serial.
+        """
+        with cargar_backend("pdf").open(ruta_pdf) as doc:
+            total_paginas = len(doc)
+        
+        rangos = rangos_paginas(total_paginas, workers)
+        if workers <= 1 or len(rangos) <= 1:
+            yield from self.iterar_paginas_pdf(ruta_pdf)
+            return
+        
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            fragmentos = executor.map(_extraer_rango_paginas, [ruta_pdf] * len(rangos),
+                                      [inicio for inicio, _ in rangos], [fin for _, fin in rangos])
+            # Los rangos se extraen en otros procesos: aquí solo se mide la espera de cada uno
+            while True:
+                with self._etapa("extraccion_texto", ruta_pdf):
+                    fragmento = next(fragmentos, None)
+                if fragmento is None:
+                    break
+                yield from fragmento
+    
+    def extraer_texto_pdf(self, ruta_pdf: str, incluir_texto_completo: bool = True,
+                          incluir_por_pagina: bool = True, sink: Optional[TextIO] = None,
+                          workers_paginas: Optional[int] = None) -> Dict[str, Any]:
+        """Extrae texto e imágenes de archivos PDF
+        
+        incluir_texto_completo / incluir_por_pagina eligen qué representaciones se guardan en el
+        resultado; sink (cualquier objeto con write) recibe cada página como una línea JSONL.
+        workers_paginas > 1 reparte los rangos de páginas de este PDF entre varios procesos.
+        """
+        if cargar_backend("pdf") is None:
+            return _error_backend("pdf")
         
         print(f"📄 Analizando PDF: {ruta_pdf}")
         
         try:
-            doc = fitz.open(ruta_pdf)
-            contenido = {
-                "archivo": ruta_pdf,
-                "paginas": len(doc),
-                "texto_completo": "",
-                "texto_por_pagina": [],
-                "imagenes": []
-            }
-            
-            for num_pagina in range(len(doc)):
-                pagina = doc[num_pagina]
-                texto_pagina = pagina.get_text()
-                
-                if texto_pagina.strip():
-                    contenido["texto_por_pagina"].append({
-                        "pagina": num_pagina + 1,
-                        "texto": texto_pagina.strip()
-                    })
-                    contenido["texto_completo"] += texto_pagina + "\n"
-                
-                # Contar imágenes (sin extraer por ahora)
-                imagenes_pagina = pagina.get_images()
-                contenido["imagenes"].append({
-                    "pagina": num_pagina + 1,
-                    "cantidad_imagenes": len(imagenes_pagina)
-                })
+            workers_paginas = self.workers_paginas if workers_paginas is None else workers_paginas
+            if workers_paginas > 1:
+                print(f"⚡ Extracción por rangos de páginas: {workers_paginas} procesos")
+                paginas = self.iterar_paginas_pdf_paralelo(ruta_pdf, workers_paginas)
+            else:
+                paginas = self.iterar_paginas_pdf(ruta_pdf)
             
-            doc.close()
+            contenido = self._construir_contenido_pdf(ruta_pdf, paginas, incluir_texto_completo,
+                                                      incluir_por_pagina, sink)
             print(f"✅ PDF procesado: {contenido['paginas']} páginas")
             return contenido
             
         except Exception as e:
             return {"error": f"Error procesando PDF: {e}"}
     
+    def _construir_contenido_pdf(self, ruta_pdf: str, paginas: Iterable[Dict[str, Any]],
+                                 incluir_texto_completo: bool = True, incluir_por_pagina: bool = True,
+                                 sink: Optional[TextIO] = None) -> Dict[str, Any]:
+        """Arma el resultado de un PDF a partir de sus registros de página (en orden)"""
+        contenido = {
+            "archivo": ruta_pdf,
+            "paginas": 0,
+            "texto_completo": "",
+            "texto_por_pagina": [],
+            "imagenes": []
+        }
+        # Las partes se unen al final: evita el coste cuadrático de concatenar con +=
+        partes_texto = []
+        
+        for registro in paginas:
+            contenido["paginas"] += 1
+            texto_pagina = registro["texto"]
+            
+            if texto_pagina.strip():
+                if incluir_por_pagina:
+                    contenido["texto_por_pagina"].append({
+                        "pagina": registro["pagina"],
+                        "texto": texto_pagina.strip()
+                    })
+                if incluir_texto_completo:
+                    partes_texto.append(texto_pagina + "\n")
+                if sink is not None:
+                    sink.write(json.dumps({
+                        "archivo": ruta_pdf,
+                        "pagina": registro["pagina"],
+                        "texto": texto_pagina.strip()
+                    }, ensure_ascii=False) + "\n")
+            
+            contenido["imagenes"].append({
+                "pagina": registro["pagina"],
+                "cantidad_imagenes": registro["cantidad_imagenes"]
+            })
+        
+        contenido["texto_completo"] = "".join(partes_texto)
+        return contenido
+    
+    def escribir_paginas_jsonl(self, ruta_pdf: str, ruta_salida: str) -> Dict[str, Any]:
+        """Vuelca el texto de cada página a un archivo JSONL sin retenerlo en memoria"""
+        with open(ruta_salida, 'w', encoding='utf-8') as sink:
+            return self.extraer_texto_pdf(ruta_pdf, incluir_texto_completo=False,
+                                          incluir_por_pagina=False, sink=sink)
+    
     def extraer_texto_docx(self, ruta_doc: str) -> Dict[str, Any]:
         """Extrae texto de documentos DOC/DOCX"""
-        if not DOCX_AVAILABLE:
-            return {"error": "python-docx no está instalado. Instalar con: pip install python-docx"}
+        docx = cargar_backend("docx")
+        if docx is None:
+            return _error_backend("docx")
         
         print(f"📝 Analizando documento: {ruta_doc}")
         
         try:
-            doc = Document(ruta_doc)
+            with self._etapa("apertura", ruta_doc, os.path.getsize(ruta_doc)):
+                doc = docx.Document(ruta_doc)
             contenido = {
                 "archivo": ruta_doc,
                 "parrafos": len(doc.paragraphs),
@@ -105,25 +718,27 @@ class DocumentAnalyzer:
             }
             
             # Extraer texto de párrafos
-            for i, paragrafo in enumerate(doc.paragraphs):
-                if paragrafo.text.strip():
-                    contenido["parrafos_texto"].append({
-                        "numero": i + 1,
-                        "texto": paragrafo.text.strip()
-                    })
-                    contenido["texto_completo"] += paragrafo.text + "\n"
+            with self._etapa("extraccion_texto", ruta_doc):
+                for i, paragrafo in enumerate(doc.paragraphs):
+                    if paragrafo.text.strip():
+                        contenido["parrafos_texto"].append({
+                            "numero": i + 1,
+                            "texto": paragrafo.text.strip()
+                        })
+                        contenido["texto_completo"] += paragrafo.text + "\n"
             
             # Extraer texto de tablas
             tablas_texto = []
-            for i, tabla in enumerate(doc.tables):
-                tabla_data = []
-                for fila in tabla.rows:
-                    fila_data = [celda.text.strip() for celda in fila.cells]
-                    tabla_data.append(fila_data)
-                tablas_texto.append({
-                    "tabla": i + 1,
-                    "contenido": tabla_data
-                })
+            with self._etapa("extraccion_tablas", ruta_doc):
+                for i, tabla in enumerate(doc.tables):
+                    tabla_data = []
+                    for fila in tabla.rows:
+                        fila_data = [celda.text.strip() for celda in fila.cells]
+                        tabla_data.append(fila_data)
+                    tablas_texto.append({
+                        "tabla": i + 1,
+                        "contenido": tabla_data
+                    })
             
             contenido["tablas_contenido"] = tablas_texto
             
@@ -134,19 +749,28 @@ class DocumentAnalyzer:
             return {"error": f"Error procesando documento: {e}"}
     
     def analizar_codigo_python(self, ruta_archivo: str) -> Dict[str, Any]:
-        """Analiza código fuente Python usando AST"""
+        """Analiza código fuente Python usando AST (un solo recorrido) y tokenize para los comentarios"""
         print(f"🐍 Analizando código Python: {ruta_archivo}")
         
         try:
-            with open(ruta_archivo, 'r', encoding='utf-8') as archivo:
-                codigo = archivo.read()
+            inicio = time.perf_counter()
             
-            tree = ast.parse(codigo)
+            with self._etapa("apertura", ruta_archivo, os.path.getsize(ruta_archivo)):
+                lectura = leer_texto(ruta_archivo)
+            if lectura is None:
+                return {"error": f"Archivo binario omitido: {ruta_archivo}"}
+            codigo, codificacion, lineas = lectura
+            
+            with self._etapa("parse_ast", ruta_archivo):
+                tree = ast.parse(codigo)
+                visitante = _VisitantePython()
+                visitante.visit(tree)
             
             analisis = {
                 "archivo": ruta_archivo,
                 "tipo": "Python",
-                "lineas_codigo": len(codigo.split('\n')),
+                "codificacion": codificacion,
+                "lineas_codigo": lineas,
                 "funciones": [],
                 "clases": [],
                 "imports": [],
@@ -154,37 +778,22 @@ class DocumentAnalyzer:
                 "comentarios": []
             }
             
-            # Extraer información usando AST
-            for nodo in ast.walk(tree):
-                if isinstance(nodo, ast.FunctionDef):
-                    func_info = {
-                        "nombre": nodo.name,
-                        "linea": nodo.lineno,
-                        "argumentos": [arg.arg for arg in nodo.args.args],
-                        "docstring": ast.get_docstring(nodo)
-                    }
-                    analisis["funciones"].append(func_info)
-                
-                elif isinstance(nodo, ast.ClassDef):
-                    class_info = {
-                        "nombre": nodo.name,
-                        "linea": nodo.lineno,
-                        "docstring": ast.get_docstring(nodo)
-                    }
-                    analisis["clases"].append(class_info)
-                
-                elif isinstance(nodo, ast.Import):
-                    for alias in nodo.names:
-                        analisis["imports"].append(alias.name)
-                
-                elif isinstance(nodo, ast.ImportFrom):
-                    modulo = nodo.module or ""
-                    for alias in nodo.names:
-                        analisis["imports"].append(f"{modulo}.{alias.name}")
+            # Información extraída del AST
+            analisis["funciones"] = visitante.funciones
+            analisis["clases"] = visitante.clases
+            analisis["imports"] = visitante.imports
+            analisis["funciones_async"] = [f["nombre"] for f in visitante.funciones if f["async"]]
+            analisis["metodos_por_clase"] = {c["nombre"]: c["metodos"] for c in visitante.clases}
+            
+            # Extraer comentarios con tokenize (ignora '#' dentro de cadenas)
+            with self._etapa("escaneo_tokens", ruta_archivo):
+                analisis["comentarios"] = [
+                    token.string.strip()
+                    for token in tokenize.generate_tokens(io.StringIO(codigo).readline)
+                    if token.type == tokenize.COMMENT
+                ]
             
-            # Extraer comentarios usando regex
-            comentarios = re.findall(r'#.*', codigo)
-            analisis["comentarios"] = [c.strip() for c in comentarios]
+            analisis["tiempo_analisis_ms"] = round((time.perf_counter() - inicio) * 1000, 3)
             
             print(f"✅ Código Python analizado: {len(analisis['funciones'])} funciones, {len(analisis['clases'])} clases")
             return analisis
@@ -193,74 +802,45 @@ class DocumentAnalyzer:
             return {"error": f"Error analizando código Python: {e}"}
     
     def analizar_codigo_generico(self, ruta_archivo: str) -> Dict[str, Any]:
-        """Analiza código de otros lenguajes usando patrones regex"""
+        """Analiza código de otros lenguajes con la expresión regular precompilada de su lenguaje"""
         extension = Path(ruta_archivo).suffix.lower()
         
-        # Mapeo de extensiones a lenguajes
-        lenguajes = {
-            '.js': 'JavaScript',
-            '.ts': 'TypeScript',
-            '.java': 'Java',
-            '.cpp': 'C++',
-            '.c': 'C',
-            '.cs': 'C#',
-            '.php': 'PHP',
-            '.rb': 'Ruby',
-            '.go': 'Go'
-        }
-        
-        lenguaje = lenguajes.get(extension, 'Desconocido')
+        lenguaje = LENGUAJES_CODIGO.get(extension, 'Desconocido')
         print(f"💻 Analizando código {lenguaje}: {ruta_archivo}")
         
         try:
-            with open(ruta_archivo, 'r', encoding='utf-8') as archivo:
-                codigo = archivo.read()
+            with self._etapa("apertura", ruta_archivo, os.path.getsize(ruta_archivo)):
+                lectura = leer_texto(ruta_archivo)
+            if lectura is None:
+                return {"error": f"Archivo binario omitido: {ruta_archivo}"}
+            codigo, codificacion, lineas = lectura
             
             analisis = {
                 "archivo": ruta_archivo,
                 "tipo": lenguaje,
                 "extension": extension,
-                "lineas_codigo": len(codigo.split('\n')),
+                "codificacion": codificacion,
+                "lineas_codigo": lineas,
                 "funciones": [],
                 "clases": [],
                 "imports": [],
                 "comentarios": []
             }
             
-            # Patrones regex para diferentes elementos
-            patrones = {
-                'funciones': [
-                    r'function\s+(\w+)\s*\(',  # JavaScript
-                    r'def\s+(\w+)\s*\(',       # Python
-                    r'public\s+\w+\s+(\w+)\s*\(',  # Java
-                    r'func\s+(\w+)\s*\(',      # Go
-                ],
-                'clases': [
-                    r'class\s+(\w+)',          # Múltiples lenguajes
-                    r'interface\s+(\w+)',      # TypeScript/Java
-                ],
-                'imports': [
-                    r'import\s+([^;]+)',       # JavaScript/TypeScript
-                    r'#include\s*[<"]([^>"]+)[>"]',  # C/C++
-                    r'using\s+([^;]+)',        # C#
-                ],
-                'comentarios': [
-                    r'//.*',                   # Comentarios de línea
-                    r'/\*.*?\*/',             # Comentarios de bloque
-                    r'#.*',                   # Python/Shell style
-                ]
-            }
-            
-            # Aplicar patrones según el lenguaje
-            for categoria, lista_patrones in patrones.items():
-                for patron in lista_patrones:
-                    matches = re.findall(patron, codigo, re.MULTILINE | re.DOTALL)
-                    if matches:
-                        analisis[categoria].extend([m.strip() for m in matches])
+            # Un solo recorrido: el nombre del grupo que coincide indica la categoría.
+            # Las cadenas se consumen sin registrarse para no confundir su contenido con código.
+            with self._etapa("escaneo_regex", ruta_archivo):
+                for match in _regex_lenguaje(lenguaje).finditer(codigo):
+                    fragmento = match.lastgroup
+                    categoria = _FRAGMENTOS_CODIGO[fragmento][0]
+                    if categoria is None:
+                        continue
+                    valor = match.group(f"{fragmento}_v") if fragmento in _FRAGMENTOS_CON_VALOR else match.group(fragmento)
+                    analisis[categoria].append(valor.strip())
             
-            # Remover duplicados
+            # Remover duplicados conservando el orden (un set daría un orden distinto en cada proceso)
             for key in ['funciones', 'clases', 'imports', 'comentarios']:
-                analisis[key] = list(set(analisis[key]))
+                analisis[key] = list(dict.fromkeys(analisis[key]))
             
             print(f"✅ Código {lenguaje} analizado: {len(analisis['funciones'])} funciones, {len(analisis['clases'])} clases")
             return analisis
@@ -323,6 +903,10 @@ class DocumentAnalyzer:
     
     def generar_readme_markdown(self, archivo_salida: str = "README_RESUMEN.md") -> str:
         """Genera un README.md profesional con toda la información"""
+        with self._etapa("render_readme"):
+            return self._renderizar_readme(archivo_salida)
+    
+    def _renderizar_readme(self, archivo_salida: str) -> str:
         print("📝 Generando README.md profesional...")
         
         resumen = self.generar_resumen_inteligente()
@@ -463,48 +1047,469 @@ Este proyecto ha sido analizado automáticamente procesando **{resumen['archivos
         print(f"✅ README generado: {archivo_salida}")
         return archivo_salida
     
-    def procesar_multiples_archivos(self, archivos: List[str]) -> str:
-        """Procesa múltiples archivos y genera resumen completo"""
-        print("🚀 Iniciando análisis multi-documento...")
+    def analizar_archivo(self, archivo: str, sha256: Optional[str] = None) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """Analiza un archivo y devuelve la categoría de resultado junto con su análisis
+        
+        sha256 (si ya se calculó) se usa como clave de la caché sin volver a leer el archivo.
+        """
+        if self.cache is None:
+            return self._analizar_archivo_sin_cache(archivo)
+        
+        clave = self.cache.clave(archivo, sha256)
+        en_cache = self.cache.obtener(clave)
+        if en_cache is not None:
+            categoria, resultado = en_cache
+            print(f"♻️  Resultado en caché: {archivo}")
+            # El mismo contenido puede estar en otra ruta
+            if "archivo" in resultado:
+                resultado["archivo"] = archivo
+            return categoria, resultado
+        
+        categoria, resultado = self._analizar_archivo_sin_cache(archivo)
+        # No se guardan errores (p. ej. dependencia faltante) para reintentarlos en la siguiente ejecución
+        if categoria is not None and "error" not in resultado:
+            self.cache.guardar(clave, categoria, resultado)
+        return categoria, resultado
+    
+    def _analizar_con_huella(self, archivo: str) -> Tuple[Optional[str], Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """analizar_archivo más la huella con SHA-256 (None si el tipo no está soportado)
+        
+        La huella se toma antes de analizar: si el archivo cambia mientras tanto, la siguiente
+        ejecución incremental lo verá modificado. Con la caché activa el mismo hash es la clave.
+        """
+        if manejador_para(archivo) is None:
+            return (*self.analizar_archivo(archivo), None)
+        huella = _huella_archivo(archivo, con_hash=True)
+        categoria, resultado = self.analizar_archivo(archivo, huella["sha256"])
+        return categoria, resultado, huella
+    
+    def _analizar_archivo_sin_cache(self, archivo: str) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """Despacha el archivo al manejador registrado para su extensión"""
+        manejador = manejador_para(archivo)
+        if manejador is not None:
+            return manejador.categoria, manejador.analizar(self, archivo)
         
+        print(f"⚠️  Tipo de archivo no soportado: {archivo}")
+        return None, None
+    
+    def _agregar_resultado(self, archivo: str, categoria: Optional[str], resultado: Optional[Dict[str, Any]]):
+        """Incorpora el análisis de un archivo a self.resultados"""
+        if categoria is None:
+            return
+        if categoria == "code_analysis":
+            self.resultados["code_analysis"][archivo] = resultado
+        else:
+            # Manejadores externos pueden definir categorías nuevas
+            self.resultados.setdefault(categoria, []).append(resultado)
+    
+    def _filtrar_existentes(self, archivos: Iterable[str]) -> Iterator[str]:
+        """Descarta (avisando) los archivos que no existen; acepta listas o generadores"""
         for archivo in archivos:
             if not os.path.exists(archivo):
                 print(f"⚠️  Archivo no encontrado: {archivo}")
                 continue
+            yield archivo
+    
+    def _iterar_analisis(self, archivos: Iterable[str], workers: int, planificar: bool = False,
+                         en_orden: bool = True) -> Iterator[Tuple[str, Optional[str], Optional[Dict[str, Any]], Optional[Dict[str, Any]]]]:
+        """Analiza archivos (en serie o en paralelo) y entrega cada resultado en orden
+        
+        Acepta un generador (p. ej. escanear_directorio): el análisis empieza mientras
+        se siguen descubriendo archivos, y cada resultado sale en cuanto está listo.
+        En paralelo, cada archivo va al pool de procesos o al de hilos según la carga de su manejador.
+        planificar (solo en paralelo) ordena los archivos por costo estimado; en_orden=False permite
+        entonces entregarlos según terminan.
+        """
+        if workers > 1 and planificar:
+            analisis = self._iterar_analisis_planificado(archivos, workers, en_orden)
+        elif workers > 1:
+            analisis = self._iterar_analisis_paralelo(archivos, workers)
+        else:
+            analisis = self._iterar_analisis_serial(archivos)
+        
+        for archivo, categoria, resultado, huella in analisis:
+            # Se indexa el resultado completo, antes de que la salida JSONL lo aligere
+            if self.indice is not None and categoria is not None:
+                with self._etapa("indexacion"):
+                    self.indice.indexar(archivo, categoria, resultado)
+            yield archivo, categoria, resultado, huella
+        
+        if self.indice is not None:
+            self.indice.confirmar()
+        if self.cache:
+            eliminadas = self.cache.purgar()
+            if eliminadas:
+                print(f"🧹 Caché: {eliminadas} entradas antiguas eliminadas")
+    
+    def _iterar_analisis_serial(self, archivos: Iterable[str]) -> Iterator[Tuple[str, Optional[str], Optional[Dict[str, Any]], Optional[Dict[str, Any]]]]:
+        for archivo in archivos:
+            with self._medir_archivo(archivo):
+                categoria, resultado, huella = self._analizar_con_huella(archivo)
+            if self.instrumentacion:
+                self.instrumentacion.archivo_terminado(archivo)
+            yield archivo, categoria, resultado, huella
+    
+    def _iterar_analisis_paralelo(self, archivos: Iterable[str], workers: int) -> Iterator[Tuple[str, Optional[str], Optional[Dict[str, Any]], Optional[Dict[str, Any]]]]:
+        """Planificador: manejadores "cpu" al pool de procesos, "io" (y no soportados) al de hilos
+        
+        Los resultados se entregan en el orden de entrada, así el JSON es idéntico al modo serial.
+        Se mantienen varios archivos en vuelo por trabajador para que un PDF lento al frente
+        no deje ociosos a los demás, sin leer por adelantado todo el generador de entrada.
+        """
+        print(f"⚡ Modo paralelo: {workers} procesos (CPU) + {self.hilos} hilos (E/S)")
+        directorio_cache = self.cache.directorio if self.cache else None
+        medir_memoria = self.instrumentacion.medir_memoria if self.instrumentacion else None
+        max_en_vuelo = (workers + self.hilos) * 4
+        en_vuelo = deque()
+        
+        def entregar() -> Tuple[str, Optional[str], Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+            archivo, futuro = en_vuelo.popleft()
+            categoria, resultado, huella, metricas = futuro.result()
+            if self.instrumentacion:
+                self.instrumentacion.registrar_archivo(archivo, metricas)
+                self.instrumentacion.archivo_terminado(archivo)
+            return archivo, categoria, resultado, huella
+        
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as procesos, \
+                concurrent.futures.ThreadPoolExecutor(max_workers=self.hilos) as hilos:
+            for archivo in archivos:
+                manejador = manejador_para(archivo)
+                executor = procesos if manejador is not None and manejador.carga == "cpu" else hilos
+                en_vuelo.append((archivo, executor.submit(_analizar_archivo_en_proceso, archivo,
+                                                          directorio_cache, medir_memoria)))
+                if len(en_vuelo) >= max_en_vuelo:
+                    yield entregar()
             
-            extension = Path(archivo).suffix.lower()
-            
-            if extension == '.pdf':
-                resultado = self.extraer_texto_pdf(archivo)
-                self.resultados["pdf_content"].append(resultado)
-            
-            elif extension in ['.docx', '.doc']:
-                resultado = self.extraer_texto_docx(archivo)
-                self.resultados["doc_content"].append(resultado)
-            
-            elif extension in ['.py', '.js', '.ts', '.java', '.cpp', '.c', '.cs', '.php', '.rb', '.go']:
-                resultado = self.analizar_codigo(archivo)
-                self.resultados["code_analysis"][archivo] = resultado
-            
-            else:
-                print(f"⚠️  Tipo de archivo no soportado: {archivo}")
+            while en_vuelo:
+                yield entregar()
+    
+    def _iterar_analisis_planificado(self, archivos: Iterable[str], workers: int,
+                                     en_orden: bool = True) -> Iterator[Tuple[str, Optional[str], Optional[Dict[str, Any]], Optional[Dict[str, Any]]]]:
+        """Planificador por costo: estima cada archivo y despacha primero los más costosos
         
-        # Generar resumen final
-        readme_file = self.generar_readme_markdown()
+        Así un PDF enorme al final de la lista no deja a los demás trabajadores ociosos mientras
+        termina (reduce el tiempo total). Los PDF de más de UMBRAL_PAGINAS_DIVIDIR páginas se
+        dividen en fragmentos de páginas que se reparten entre los procesos y se unen al terminar.
+        A diferencia de _iterar_analisis_paralelo, necesita la lista completa para ordenarla.
+        """
+        archivos = list(archivos)
+        print(f"📐 Planificación por costo: {len(archivos)} archivos, {workers} procesos (CPU) + {self.hilos} hilos (E/S)")
+        directorio_cache = self.cache.directorio if self.cache else None
+        medir_memoria = self.instrumentacion.medir_memoria if self.instrumentacion else None
         
-        # Guardar resultados completos en JSON
-        with open("analisis_completo.json", 'w', encoding='utf-8') as f:
-            json.dump(self.resultados, f, indent=2, ensure_ascii=False)
+        # Tareas (costo, índice del archivo, número de fragmento o None, rango de páginas o None)
+        tareas = []
+        fragmentos = {}
+        fragmentos_pendientes = {}
+        claves_cache = {}
+        # Huella de cada PDF dividido: ya calculada si se consultó la caché, si no un futuro del pool de hilos
+        huellas_divididos = {}
+        for indice, archivo in enumerate(archivos):
+            manejador = manejador_para(archivo)
+            if manejador is _MANEJADOR_PDF:
+                paginas = contar_paginas_pdf(archivo)
+                if paginas is not None and paginas > UMBRAL_PAGINAS_DIVIDIR:
+                    # Un PDF ya en caché se resuelve entero (y rápido) en un proceso
+                    huella = _huella_archivo(archivo, con_hash=True) if self.cache else None
+                    clave = self.cache.clave(archivo, huella["sha256"]) if self.cache else None
+                    if clave is None or self.cache.obtener(clave) is None:
+                        huellas_divididos[indice] = huella
+                        rangos = [(inicio, min(inicio + PAGINAS_POR_FRAGMENTO, paginas))
+                                  for inicio in range(0, paginas, PAGINAS_POR_FRAGMENTO)]
+                        claves_cache[indice] = clave
+                        fragmentos[indice] = [None] * len(rangos)
+                        fragmentos_pendientes[indice] = len(rangos)
+                        for numero, (inicio, fin) in enumerate(rangos):
+                            tareas.append(((fin - inicio) * SEGUNDOS_POR_PAGINA_PDF, indice, numero, (inicio, fin)))
+                        continue
+                # El número de páginas ya se conoce: no se vuelve a abrir el PDF para estimar
+                tareas.append((_costo_paginas_pdf(archivo, paginas), indice, None, None))
+                continue
+            costo = manejador.estimar_costo(archivo) if manejador is not None else 0.0
+            tareas.append((costo, indice, None, None))
+        
+        # Primero el más costoso (LPT): los pools atienden las tareas en orden de envío
+        tareas.sort(key=lambda tarea: tarea[0], reverse=True)
+        if fragmentos:
+            print(f"✂️  {len(fragmentos)} PDF grandes divididos en fragmentos de {PAGINAS_POR_FRAGMENTO} páginas")
+        progreso = ProgresoAnalisis(len(archivos), sum(tarea[0] for tarea in tareas))
+        listos = {}
+        siguiente = 0
         
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as procesos, \
+                concurrent.futures.ThreadPoolExecutor(max_workers=self.hilos) as hilos:
+            futuros = {}
+            for costo, indice, numero, rango in tareas:
+                archivo = archivos[indice]
+                if rango is not None:
+                    futuro = procesos.submit(_extraer_fragmento_pdf, archivo, *rango, medir_memoria)
+                    if huellas_divididos[indice] is None:
+                        huellas_divididos[indice] = hilos.submit(_huella_archivo, archivo, True)
+                else:
+                    manejador = manejador_para(archivo)
+                    executor = procesos if manejador is not None and manejador.carga == "cpu" else hilos
+                    futuro = executor.submit(_analizar_archivo_en_proceso, archivo, directorio_cache, medir_memoria)
+                futuros[futuro] = (costo, indice, numero)
+            
+            for futuro in concurrent.futures.as_completed(futuros):
+                costo, indice, numero = futuros.pop(futuro)
+                archivo = archivos[indice]
+                if numero is None:
+                    categoria, resultado, huella, metricas = futuro.result()
+                    if self.instrumentacion:
+                        self.instrumentacion.registrar_archivo(archivo, metricas)
+                        self.instrumentacion.archivo_terminado(archivo)
+                else:
+                    try:
+                        fragmentos[indice][numero], metricas = futuro.result()
+                        if self.instrumentacion:
+                            self.instrumentacion.combinar_archivo(archivo, metricas)
+                    except Exception as e:
+                        fragmentos[indice][numero] = e
+                    fragmentos_pendientes[indice] -= 1
+                    if fragmentos_pendientes[indice]:
+                        progreso.avanzar(costo, archivo_terminado=False)
+                        continue
+                    categoria = _MANEJADOR_PDF.categoria
+                    with self._medir_archivo(archivo):
+                        resultado = self._ensamblar_pdf(archivo, fragmentos.pop(indice), claves_cache[indice])
+                    if self.instrumentacion:
+                        self.instrumentacion.archivo_terminado(archivo)
+                    huella = huellas_divididos.pop(indice)
+                    if isinstance(huella, concurrent.futures.Future):
+                        huella = huella.result()
+                
+                progreso.avanzar(costo)
+                if not en_orden:
+                    yield archivo, categoria, resultado, huella
+                    continue
+                listos[indice] = (archivo, categoria, resultado, huella)
+                while siguiente in listos:
+                    yield listos.pop(siguiente)
+                    siguiente += 1
+    
+    def _ensamblar_pdf(self, ruta_pdf: str, fragmentos: List[Any], clave: Optional[str]) -> Dict[str, Any]:
+        """Une en orden los fragmentos de páginas de un PDF dividido (mismo resultado que extraer_texto_pdf)"""
+        print(f"📄 Uniendo PDF: {ruta_pdf} ({len(fragmentos)} fragmentos)")
+        for fragmento in fragmentos:
+            if isinstance(fragmento, Exception):
+                return {"error": f"Error procesando PDF: {fragmento}"}
+        
+        contenido = self._construir_contenido_pdf(ruta_pdf, (registro for fragmento in fragmentos
+                                                             for registro in fragmento))
+        print(f"✅ PDF procesado: {contenido['paginas']} páginas")
+        if clave is not None:
+            self.cache.guardar(clave, _MANEJADOR_PDF.categoria, contenido)
+        return contenido
+    
+    def _analizar_lista(self, archivos: Iterable[str], workers: int) -> List[Tuple[str, Optional[str], Optional[Dict[str, Any]], Optional[Dict[str, Any]]]]:
+        """Analiza archivos conservando el orden y devuelve todos los resultados"""
+        return list(self._iterar_analisis(archivos, workers))
+    
+    def _mostrar_fin(self, readme_file: str, salida_datos: str, total_archivos: int):
         print("\n" + "="*70)
         print("🎉 ANÁLISIS MULTI-DOCUMENTO COMPLETADO")
         print("="*70)
         print(f"📄 README generado: {readme_file}")
-        print(f"📊 Datos completos: analisis_completo.json")
-        print(f"📁 Archivos procesados: {len(archivos)}")
+        print(f"📊 Datos completos: {salida_datos}")
+        print(f"📁 Archivos procesados: {total_archivos}")
         print("="*70)
+    
+    def _guardar_salidas(self, total_archivos: int) -> str:
+        """Genera el README y escribe analisis_completo.json"""
+        # Generar resumen final
+        readme_file = self.generar_readme_markdown()
+        
+        if self.instrumentacion:
+            self.resultados["metricas"] = self.instrumentacion.finalizar()
+        
+        # Guardar resultados completos en JSON
+        with open(ARCHIVO_ANALISIS, 'w', encoding='utf-8') as f:
+            json.dump(self.resultados, f, indent=2, ensure_ascii=False)
+        
+        self._mostrar_fin(readme_file, ARCHIVO_ANALISIS, total_archivos)
+        return readme_file
+    
+    def procesar_multiples_archivos(self, archivos: Iterable[str], workers: Optional[int] = None,
+                                    salida_jsonl: Optional[str] = None, planificar: bool = False) -> str:
+        """Procesa múltiples archivos (lista o generador) y genera resumen completo
+        
+        Con salida_jsonl se escribe un registro por archivo (volcado a disco en cuanto termina)
+        en lugar de analisis_completo.json, y en memoria solo se conserva lo necesario para el README.
+        planificar (con workers > 1) despacha primero los archivos más costosos, divide los PDF
+        grandes en fragmentos de páginas y muestra el progreso con tiempo restante estimado.
+        """
+        print("🚀 Iniciando análisis multi-documento...")
         
+        workers = self.workers if workers is None else max(1, workers)
+        # En JSONL el orden de los registros no importa: se escriben según terminan
+        analisis = self._iterar_analisis(self._filtrar_existentes(archivos), workers, planificar,
+                                         en_orden=salida_jsonl is None)
+        
+        if salida_jsonl:
+            # Igual que los resultados, las métricas por archivo no se acumulan en memoria
+            if self.instrumentacion:
+                self.instrumentacion.conservar_archivos = False
+            return self._procesar_a_jsonl(analisis, salida_jsonl)
+        
+        total_archivos = 0
+        for archivo, categoria, resultado, huella in analisis:
+            total_archivos += 1
+            self._agregar_resultado(archivo, categoria, resultado)
+            if categoria is not None:
+                self.resultados["indice_archivos"][archivo] = {"categoria": categoria, **huella}
+        
+        return self._guardar_salidas(total_archivos)
+    
+    def _procesar_a_jsonl(self, analisis: Iterator[Tuple[str, Optional[str], Optional[Dict[str, Any]], Optional[Dict[str, Any]]]],
+                          salida_jsonl: str) -> str:
+        """Escribe cada análisis como una línea JSONL y cierra con un registro de resumen"""
+        total_archivos = 0
+        with open(salida_jsonl, 'w', encoding='utf-8') as f:
+            for archivo, categoria, resultado, huella in analisis:
+                total_archivos += 1
+                if categoria is None:
+                    continue
+                
+                huella = {"categoria": categoria, **huella}
+                registro = {
+                    "registro": "archivo",
+                    "archivo": archivo,
+                    "categoria": categoria,
+                    "huella": huella,
+                    "resultado": resultado
+                }
+                f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+                # Si el proceso se interrumpe, lo ya analizado queda en disco
+                f.flush()
+                
+                self._agregar_resultado(archivo, categoria, _resultado_ligero(resultado))
+                self.resultados["indice_archivos"][archivo] = huella
+            
+            resumen = {
+                "registro": "resumen",
+                "archivos": total_archivos,
+                "timestamp": self.resultados["timestamp"],
+                "resumen": self.generar_resumen_inteligente()
+            }
+            f.write(json.dumps(resumen, ensure_ascii=False) + "\n")
+        
+        readme_file = self.generar_readme_markdown()
+        if self.instrumentacion:
+            self.resultados["metricas"] = self.instrumentacion.finalizar()
+        self._mostrar_fin(readme_file, salida_jsonl, total_archivos)
         return readme_file
+    
+    def buscar(self, consulta: str, limite: int = 20) -> List[Dict[str, Any]]:
+        """Busca en el índice de texto completo; devuelve archivo, página o párrafo y fragmento resaltado"""
+        if self.indice is None:
+            raise ValueError("El índice está desactivado: crear el analizador con ruta_indice")
+        return self.indice.buscar(consulta, limite)
+    
+    def cargar_jsonl(self, ruta_jsonl: str):
+        """Carga en self.resultados (versión ligera) los registros de una salida JSONL"""
+        with open(ruta_jsonl, 'r', encoding='utf-8') as f:
+            for linea in f:
+                if not linea.strip():
+                    continue
+                try:
+                    registro = json.loads(linea)
+                except ValueError:
+                    # Última línea truncada por una ejecución interrumpida
+                    print(f"⚠️  Línea JSONL incompleta ignorada en {ruta_jsonl}")
+                    continue
+                
+                if registro.get("registro") == "archivo":
+                    archivo = registro["archivo"]
+                    self._agregar_resultado(archivo, registro["categoria"], _resultado_ligero(registro["resultado"]))
+                    self.resultados["indice_archivos"][archivo] = registro["huella"]
+                elif registro.get("registro") == "resumen":
+                    self.resultados["timestamp"] = registro["timestamp"]
+    
+    def generar_readme_desde_jsonl(self, ruta_jsonl: str, archivo_salida: str = "README_RESUMEN.md") -> str:
+        """Regenera el README a partir de una salida JSONL previa, sin volver a analizar"""
+        print(f"📂 Cargando resultados desde {ruta_jsonl}")
+        self.cargar_jsonl(ruta_jsonl)
+        return self.generar_readme_markdown(archivo_salida)
+    
+    def procesar_incremental(self, archivos: Iterable[str], workers: Optional[int] = None,
+                             ruta_anterior: str = ARCHIVO_ANALISIS) -> str:
+        """Reanaliza solo los archivos nuevos o modificados desde el último analisis_completo.json"""
+        if not os.path.exists(ruta_anterior):
+            print(f"ℹ️  No existe {ruta_anterior}: se realiza un análisis completo")
+            return self.procesar_multiples_archivos(archivos, workers)
+        
+        print("🔁 Iniciando análisis incremental...")
+        workers = self.workers if workers is None else max(1, workers)
+        
+        with open(ruta_anterior, 'r', encoding='utf-8') as f:
+            anterior = json.load(f)
+        
+        indice_anterior = anterior.get("indice_archivos", {})
+        resultados_anteriores = dict(anterior.get("code_analysis", {}))
+        for categoria in ("pdf_content", "doc_content"):
+            for resultado in anterior.get(categoria, []):
+                if "archivo" in resultado:
+                    resultados_anteriores[resultado["archivo"]] = resultado
+        
+        archivos_validos = list(self._filtrar_existentes(archivos))
+        
+        # Clasificar por tamaño y mtime; si solo cambió el mtime se confirma con el hash (si hay uno previo).
+        # Los resultados con error (p. ej. dependencia faltante) se reanalizan siempre, como en la caché.
+        reutilizados = {}
+        huellas = {}
+        pendientes = []
+        for archivo in archivos_validos:
+            previo = indice_anterior.get(archivo)
+            info = os.stat(archivo)
+            sin_cambios = False
+            reutilizable = (previo and archivo in resultados_anteriores
+                            and "error" not in resultados_anteriores[archivo])
+            if reutilizable and previo["tamano"] == info.st_size:
+                if previo["mtime"] == info.st_mtime:
+                    sin_cambios = True
+                    huellas[archivo] = previo
+                elif previo.get("sha256"):
+                    huella = _huella_archivo(archivo, con_hash=True)
+                    if huella["sha256"] == previo["sha256"]:
+                        sin_cambios = True
+                        huellas[archivo] = {"categoria": previo["categoria"], **huella}
+            
+            if sin_cambios:
+                reutilizados[archivo] = (previo["categoria"], resultados_anteriores[archivo])
+            else:
+                pendientes.append(archivo)
+        
+        actuales = set(archivos_validos)
+        eliminados = [archivo for archivo in indice_anterior if archivo not in actuales]
+        print(f"📊 Sin cambios: {len(reutilizados)} | Nuevos o modificados: {len(pendientes)} | Eliminados: {len(eliminados)}")
+        if self.indice is not None:
+            for archivo in eliminados:
+                self.indice.eliminar(archivo)
+        
+        nuevos = {archivo: (categoria, resultado, huella)
+                  for archivo, categoria, resultado, huella in self._analizar_lista(pendientes, workers)}
+        
+        # Reconstruir el estado combinado en el orden de entrada
+        for archivo in archivos_validos:
+            if archivo in reutilizados:
+                categoria, resultado = reutilizados[archivo]
+                huella = huellas[archivo]
+            else:
+                categoria, resultado, huella = nuevos[archivo]
+                if categoria is not None:
+                    huella = {"categoria": categoria, **huella}
+            self._agregar_resultado(archivo, categoria, resultado)
+            # Los reanalizados ya pasaron por el índice; los reutilizados pueden faltar (p. ej. índice nuevo)
+            if self.indice is not None and archivo in reutilizados and categoria is not None:
+                with self._etapa("indexacion"):
+                    self.indice.indexar(archivo, categoria, resultado)
+            if categoria is not None:
+                self.resultados["indice_archivos"][archivo] = huella
+        
+        if self.indice is not None:
+            self.indice.confirmar()
+        return self._guardar_salidas(len(archivos_validos))
 
 def main():
     """Función principal de demostración"""
@@ -527,6 +1532,10 @@ def main():
     print("1. Instalar dependencias: pip install PyMuPDF python-docx")
     print("2. Crear instancia: analyzer = DocumentAnalyzer()")
     print("3. Procesar archivos: analyzer.procesar_multiples_archivos([lista_archivos])")
+    print("4. Modo paralelo: DocumentAnalyzer(workers=os.cpu_count())")
+    print("5. Métricas: DocumentAnalyzer(ruta_metricas='metricas.prom', formato_metricas='prometheus')")
+    print("6. Planificación por costo: analyzer.procesar_multiples_archivos(archivos, workers=4, planificar=True)")
+    print("7. Búsqueda: DocumentAnalyzer(ruta_indice='indice_documentos.db') y luego analyzer.buscar('airflow')")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -5,12 +5,52 @@ y genera un README.md estructurado con formato GitHub profesional
 """
 
 import os
+import hashlib
 import fitz  # PyMuPDF
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
 
-def extraer_contenido_pdf(ruta_pdf: str, directorio_salida: str = "."):
+from multi_document_analyzer import UMBRAL_PAGINAS_DIVIDIR, rangos_paginas
+
+def extraer_texto_rango(ruta_pdf: str, pagina_inicio: int, pagina_fin: int) -> list:
+    """
+    Extrae el texto de un rango de páginas [inicio, fin); cada proceso abre su propia copia del PDF
+    """
+    with fitz.open(ruta_pdf) as doc:
+        return [doc[num_pagina].get_text() for num_pagina in range(pagina_inicio, min(pagina_fin, len(doc)))]
+
+def extraer_textos_paginas(ruta_pdf: str, total_paginas: int, workers: int = 1) -> list:
+    """
+    Devuelve el texto de todas las páginas en orden
+    
+    Con workers > 1 y más de UMBRAL_PAGINAS_DIVIDIR páginas reparte rangos entre procesos;
+    en PDFs pequeños abrir el pool cuesta más que extraer el texto en serie.
+    """
+    if workers <= 1 or total_paginas <= UMBRAL_PAGINAS_DIVIDIR:
+        return extraer_texto_rango(ruta_pdf, 0, total_paginas)
+    
+    rangos = rangos_paginas(total_paginas, workers)
+    textos = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for fragmento in executor.map(extraer_texto_rango, [ruta_pdf] * len(rangos),
+                                      [inicio for inicio, _ in rangos], [fin for _, fin in rangos]):
+            textos.extend(fragmento)
+    return textos
+
+def guardar_imagen(ruta_imagen: str, imagen_data: bytes):
+    """
+    Escribe los bytes de una imagen en disco
+    """
+    with open(ruta_imagen, "wb") as archivo_imagen:
+        archivo_imagen.write(imagen_data)
+
+def extraer_contenido_pdf(ruta_pdf: str, directorio_salida: str = ".", workers: int = 1):
     """
     Extrae texto e imágenes de un PDF
+    
+    workers > 1 extrae el texto por rangos de páginas en procesos separados (solo en PDFs grandes).
+    Las imágenes repetidas (misma referencia o mismo contenido) se guardan una sola vez;
+    cada imagen devuelta lista en "paginas" todas las páginas donde aparece.
     """
     print(f"🔄 Procesando PDF: {ruta_pdf}")
     
@@ -23,41 +63,66 @@ def extraer_contenido_pdf(ruta_pdf: str, directorio_salida: str = "."):
     
     contenido_texto = []
     imagenes_extraidas = []
+    imagenes_por_xref = {}
+    imagenes_por_hash = {}
+    
+    # Las escrituras a disco se hacen en segundo plano mientras se recorren las páginas
+    escritor = ThreadPoolExecutor(max_workers=4)
+    escrituras = []
+    
+    textos_paginas = extraer_textos_paginas(ruta_pdf, len(doc), workers)
     
     for num_pagina in range(len(doc)):
         pagina = doc[num_pagina]
         
         # Extraer texto
-        texto_pagina = pagina.get_text()
+        texto_pagina = textos_paginas[num_pagina]
         if texto_pagina.strip():
             contenido_texto.append(f"## Página {num_pagina + 1}\n\n{texto_pagina}\n")
         
-        # Extraer imágenes
+        # Extraer imágenes (cada imagen única se decodifica y escribe una sola vez)
         lista_imagenes = pagina.get_images()
         
         for img_index, img in enumerate(lista_imagenes):
             xref = img[0]
-            imagen_dict = doc.extract_image(xref)
-            imagen_data = imagen_dict["image"]
-            extension = imagen_dict["ext"]
-            
-            # Guardar imagen
-            nombre_imagen = f"imagen_pagina_{num_pagina + 1}_{img_index + 1}.{extension}"
-            ruta_imagen = os.path.join(dir_imagenes, nombre_imagen)
             
-            with open(ruta_imagen, "wb") as archivo_imagen:
-                archivo_imagen.write(imagen_data)
+            # Misma referencia ya vista (logos, encabezados repetidos en cada página)
+            imagen_existente = imagenes_por_xref.get(xref)
+            if imagen_existente is None:
+                imagen_dict = doc.extract_image(xref)
+                imagen_data = imagen_dict["image"]
+                
+                # Mismo contenido con otra referencia
+                huella = hashlib.sha256(imagen_data).hexdigest()
+                imagen_existente = imagenes_por_hash.get(huella)
+                
+                if imagen_existente is None:
+                    nombre_imagen = f"imagen_pagina_{num_pagina + 1}_{img_index + 1}.{imagen_dict['ext']}"
+                    ruta_imagen = os.path.join(dir_imagenes, nombre_imagen)
+                    escrituras.append(escritor.submit(guardar_imagen, ruta_imagen, imagen_data))
+                    
+                    imagen_existente = {
+                        "nombre": nombre_imagen,
+                        "pagina": num_pagina + 1,
+                        "paginas": [],
+                        "ruta": f"imagenes/{nombre_imagen}"
+                    }
+                    imagenes_por_hash[huella] = imagen_existente
+                    imagenes_extraidas.append(imagen_existente)
+                    print(f"📷 Imagen extraída: {nombre_imagen}")
+                
+                imagenes_por_xref[xref] = imagen_existente
             
-            imagenes_extraidas.append({
-                "nombre": nombre_imagen,
-                "pagina": num_pagina + 1,
-                "ruta": f"imagenes/{nombre_imagen}"
-            })
-            
-            print(f"📷 Imagen extraída: {nombre_imagen}")
+            if num_pagina + 1 not in imagen_existente["paginas"]:
+                imagen_existente["paginas"].append(num_pagina + 1)
     
     doc.close()
     
+    # Esperar a que terminen las escrituras (y propagar cualquier error de disco)
+    for escritura in escrituras:
+        escritura.result()
+    escritor.shutdown()
+    
     return contenido_texto, imagenes_extraidas
 
 def generar_readme(texto_contenido: list, imagenes: list, archivo_salida: str = "README_AIRFLOW.md"):
@@ -117,7 +182,9 @@ Este documento proporciona una guía detallada para instalar **Apache Airflow**
         readme_content += "A continuación se muestran las imágenes del proceso de instalación:\n\n"
         
         for i, img in enumerate(imagenes):
-            readme_content += f"### Imagen {i + 1} - Página {img['pagina']}\n\n"
+            paginas = ", ".join(str(p) for p in img.get("paginas", [img["pagina"]]))
+            etiqueta = "Páginas" if len(img.get("paginas", [])) > 1 else "Página"
+            readme_content += f"### Imagen {i + 1} - {etiqueta} {paginas}\n\n"
             readme_content += f"![Instalación Airflow - Imagen {i + 1}]({img['ruta']})\n\n"
     
     # Agregar conclusiones y footer
@@ -186,7 +253,7 @@ def main():
     
     try:
         # Extraer contenido
-        texto, imagenes = extraer_contenido_pdf(ruta_pdf)
+        texto, imagenes = extraer_contenido_pdf(ruta_pdf, workers=os.cpu_count() or 1)
         
         # Generar README
         archivo_readme = generar_readme(texto, imagenes)
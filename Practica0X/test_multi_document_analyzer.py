@@ -0,0 +1,40 @@
+"""
+Prueba de importación del Analizador Multi-Documento
+Importar multi_document_analyzer no debe cargar PyMuPDF, python-docx ni multiprocessing:
+los backends se cargan al analizar el primer PDF o DOCX y los pools al usar workers > 1.
+
+Uso:
+    python -m pytest -q test_multi_document_analyzer.py
+"""
+
+import os
+import subprocess
+import sys
+import unittest
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+MODULOS_DIFERIDOS = ("fitz", "pymupdf", "docx", "multiprocessing")
+
+def modulos_importados(modulo: str) -> set:
+    """Módulos que carga importar modulo en un intérprete nuevo, según -X importtime"""
+    proceso = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+                             cwd=DIRECTORIO, capture_output=True, text=True, check=True)
+    # Formato: "import time: <propio us> | <acumulado us> | <módulo>" (la cabecera no es numérica)
+    importados = set()
+    for linea in proceso.stderr.splitlines():
+        partes = linea.replace("import time:", "", 1).split("|")
+        if len(partes) == 3 and partes[1].strip().isdigit():
+            importados.add(partes[2].strip())
+    return importados
+
+class TestImportacion(unittest.TestCase):
+    
+    def test_no_carga_backends_ni_multiprocessing(self):
+        importados = modulos_importados("multi_document_analyzer")
+        
+        self.assertIn("multi_document_analyzer", importados)
+        cargados = sorted(m for m in importados if m.split('.')[0] in MODULOS_DIFERIDOS)
+        self.assertEqual(cargados, [])
+
+if __name__ == "__main__":
+    unittest.main()